@@ -145,8 +145,7 @@ class AnalyzerManager:
                 self.analyzers['similarity'] = SimilarityAnalyzer()
             
             # First run pre-computation if not already done
-            if not hasattr(self.analyzers['similarity'], 'precomputed_scores') or \
-               not self.analyzers['similarity'].precomputed_scores:
+            if getattr(self.analyzers['similarity'], 'score_tensor', None) is None:
                 if progress_callback:
                     progress_callback(10, "Pre-computing similarity scores")
                 self.analyzers['similarity'].analyze(data['results'], {}, progress_callback)
@@ -34,6 +34,38 @@ RATE_LIMITS = {
     'quickgo': 0.5
 }
 
+# HTTP timeouts as (connect, read) tuples in seconds
+REQUEST_TIMEOUTS = {
+    'compartments': (3.05, 8),
+    'compartments_total': 45  # Wall-clock budget per gene across all strategies
+}
+
+# On-disk HTTP response cache for human protein lookups (used when requests-cache is installed)
+HTTP_CACHE = {
+    'cache_name': 'hpa_cache',
+    'backend': 'sqlite',
+    'expire_after': 86400 * 7  # One week
+}
+
+# Genes recently found to have no HPA data, skipped on later runs until the entry expires
+HPA_MISSING_CACHE = {
+    'path': 'hpa_missing.json',
+    'expire_after': 86400 * 7  # One week
+}
+
+# Resolved gene symbol -> Ensembl ID mappings, reused across runs until the entry expires
+ENSEMBL_CACHE = {
+    'path': 'ensembl_symbols.json',
+    'expire_after': 86400 * 30,  # Thirty days
+    'missing_expire_after': 86400 * 7  # Unresolved symbols are retried after a week
+}
+
+# Finished analysis runs, reused when the same input file is analyzed with the same settings
+RUN_CACHE = {
+    'path': 'protmerge_runs.json',
+    'expire_after': 86400  # One day
+}
+
 DEFAULT_OPTIONS = {
     'uniprot': True,   # Enable UniProt by default for basic protein info
     'protparam': False,
@@ -120,6 +152,9 @@ SIMILARITY_COLUMNS = {
     'amino_acid_similarity': 'Amino Acid Similarity'
 }
 
+# Placeholder values (upper-cased) that mean a property is missing, for the similarity analysis
+INVALID_VALUES = frozenset({'', 'NO VALUE FOUND', 'NAN', 'NONE', 'N/A', 'UNKNOWN', 'NULL'})
+
 # Amino acid composition columns
 AMINO_ACID_COLUMNS = {
     'ala': 'Ala (A)', 'arg': 'Arg (R)', 'asn': 'Asn (N)', 'asp': 'Asp (D)', 'cys': 'Cys (C)',
@@ -14,14 +14,19 @@ class DataHandler:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
     
-    def load_excel_data(self, input_file, sheet_name, column_index, safe_mode=True):
+    def load_excel_data(self, input_file, sheet_name, column_index, safe_mode=True, read_excel_kwargs=None):
         """Load and prepare data from Excel file"""
         try:
-            # Read Excel file
-            df = pd.read_excel(input_file, sheet_name=sheet_name)
+            # Read only the ID column, as-is, so pandas doesn't type-infer every column of wide sheets
+            read_kwargs = {'usecols': [column_index], 'dtype': object}
+            read_kwargs.update(read_excel_kwargs or {})
+            df = pd.read_excel(input_file, sheet_name=sheet_name, **read_kwargs)
             
             # Get UniProt column
-            uniprot_col_name = df.columns[column_index]
+            if read_kwargs.get('usecols') == [column_index]:
+                uniprot_col_name = df.columns[0]
+            else:
+                uniprot_col_name = df.columns[column_index]
             uniprot_ids = df[uniprot_col_name].dropna().tolist()
             
             # Create results DataFrame
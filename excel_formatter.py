@@ -19,6 +19,7 @@ class ExcelFormatter:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self.saved_sheet_names = None  # Sheet names of the workbook last written by save_results
         self.logger.info("ExcelFormatter initialized")
     
     def save_results(self, input_file, results, options):
@@ -26,6 +27,8 @@ class ExcelFormatter:
         Save results to professionally formatted Excel file with multiple sheets.
         FIXED: Only creates main sheet if UniProt-dependent analyses were requested AND have data.
         """
+        self.saved_sheet_names = None
+        
         try:
             self.logger.info(f"Creating Excel output for {len(results)} proteins")
         
@@ -79,6 +82,7 @@ class ExcelFormatter:
             # Save workbook
             saved_file = self._save_workbook(wb, output_file)
             if saved_file:
+                self.saved_sheet_names = list(wb.sheetnames)
                 self.logger.info(f"Created Excel sheets: {', '.join(sheets_created)}")
         
             return saved_file
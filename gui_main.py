@@ -627,6 +627,7 @@ class OptionsModal:
         
         # Settings
         self.safe_mode_var = tk.BooleanVar(value=opts.get('safe_mode', True))
+        self.use_cache_var = tk.BooleanVar(value=opts.get('use_cache', True))
     
         # Store references to checkboxes for conditional enabling
         self.compartments_cb = None
@@ -640,7 +641,7 @@ class OptionsModal:
     def show(self):
         self.modal = tk.Toplevel(self.parent)
         self.modal.title("Analysis Options")
-        self.modal.geometry("550x700")
+        self.modal.geometry("550x730")
         self.modal.configure(bg=Theme.BG)
         self.modal.resizable(False, False)
         self.modal.transient(self.parent)
@@ -689,6 +690,7 @@ class OptionsModal:
         # Settings section
         settings = self._create_section(content, "Settings")
         self._create_option(settings, "Safe Mode", "Preserve existing data", self.safe_mode_var)
+        self._create_option(settings, "Reuse Previous Results", "Reuse output of an identical earlier run; uncheck to rerun", self.use_cache_var)
 
         # Set up conditional enabling
         self._setup_conditional_enabling()
@@ -823,7 +825,8 @@ class OptionsModal:
             'pdb_search': self.pdb_var.get(),
             
             # Settings
-            'safe_mode': self.safe_mode_var.get()
+            'safe_mode': self.safe_mode_var.get(),
+            'use_cache': self.use_cache_var.get()
         }
         self.modal.destroy()
 
@@ -845,6 +848,11 @@ class ProtMergeGUI:
         self.column_selected = False
         self.options_configured = False
 
+        # Progress offset and share per enabled stage, rebuilt at the start of each analysis
+        self.stage_table = None
+        # Stage for each progress label, keyed on the label without its "(i/n)" counter
+        self.stage_cache = {}
+
         # Similarity state
         self.similarity_file = None
         self.similarity_file_selected = False
@@ -1435,6 +1443,8 @@ class ProtMergeGUI:
     def _run_analysis(self):
         """Run analysis in background thread - ensure summary is passed correctly"""
         try:
+            self.stage_table = self._precompute_stage_weights()
+
             def progress_callback(pct, main_text, detail_text=""):
                 adjusted_progress = self._calculate_smooth_progress(pct, main_text)
                 self.root.after(0, self._update_progress, adjusted_progress, main_text, detail_text)
@@ -1458,8 +1468,23 @@ class ProtMergeGUI:
 
     def _calculate_smooth_progress(self, raw_progress, main_text):
         """Calculate smooth progress based on enabled analyses"""
-        stage = self._identify_stage(main_text.lower())
+        if self.stage_table is None:
+            self.stage_table = self._precompute_stage_weights()
+
+        label = main_text.split(' (', 1)[0]
+        stage = self.stage_cache.get(label)
+        if stage is None:
+            stage = self.stage_cache[label] = self._identify_stage(label.lower())
+        raw_progress = min(max(raw_progress, 0), 100)
+
+        if stage in self.stage_table:
+            offset, share = self.stage_table[stage]
+            return min(offset + (share * (raw_progress / 100)), 99)
 
+        return min(raw_progress, 99)
+
+    def _precompute_stage_weights(self):
+        """Map each enabled stage to its (starting offset, share) of the overall progress"""
         stage_weights = {'uniprot': 40}
         total_weight = 40
 
@@ -1475,23 +1500,15 @@ class ProtMergeGUI:
             stage_weights['pdb'] = 10
             total_weight += 10
 
-        # Normalize weights
-        for s in stage_weights:
-            stage_weights[s] = (stage_weights[s] / total_weight) * 100
-
-        # Calculate cumulative progress
+        # Normalize weights and accumulate offsets (stages were added in pipeline order)
+        stage_table = {}
         cumulative = 0
-        stage_order = ['uniprot', 'protparam', 'blast', 'pdb']
-
-        for i, s in enumerate(stage_order):
-            if s in stage_weights:
-                if s == stage:
-                    stage_progress = min(max(raw_progress, 0), 100) / 100
-                    return min(cumulative + (stage_weights[s] * stage_progress), 99)
-                elif stage_order.index(s) < stage_order.index(stage):
-                    cumulative += stage_weights[s]
+        for stage, weight in stage_weights.items():
+            share = (weight / total_weight) * 100
+            stage_table[stage] = (cumulative, share)
+            cumulative += share
 
-        return min(max(raw_progress, 0), 99)
+        return stage_table
 
     def _identify_stage(self, text):
         """Identify current analysis stage"""
@@ -1,20 +1,260 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
 import json
 import logging
+import numpy as np
 import pandas as pd
-import xml.etree.ElementTree as ET
 import re
+import csv
+import threading
+from collections import Counter
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from urllib.parse import quote, urlencode
+from lxml import etree as ET
 from config import *
 
+# Optional: Aho-Corasick keyword matching (pyahocorasick)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Optional: faster JSON decoding of large API payloads (orjson)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Optional: persistent HTTP response caching (requests-cache)
+try:
+    import requests_cache
+except ImportError:
+    requests_cache = None
+
+# Maximum concurrent HPA strategy requests
+HPA_MAX_WORKERS = 8
+
+# HPA retrieval strategies in priority order: (label, method name)
+HPA_STRATEGIES = (
+    ("HPA XML", "_get_hpa_xml_by_gene"),
+    ("HPA web scraping", "_get_hpa_web_safe"),
+    ("Expression Atlas", "_get_expression_atlas_enhanced"),
+    ("GTEx", "_get_gtex_data"),
+    ("UniProt tissue", "_get_uniprot_tissue_enhanced"),
+)
+
+# Caps on what a single HPA XML entry contributes
+HPA_XML_MAX_TISSUES = 20
+HPA_XML_MAX_LOCATIONS = 10
+HPA_XML_MAX_ANTIBODIES = 10
+
+# Symbols per batched Ensembl lookup (the REST API's POST limit)
+ENSEMBL_BATCH_SIZE = 1000
+
+# Symbols per batched MyGene.info query (the service's POST limit)
+MYGENE_BATCH_SIZE = 1000
+
+# Concurrent single-symbol Ensembl lookups when a batch request fails
+ENSEMBL_MAX_WORKERS = 8
+
+# Ensembl REST allows 15 requests per second; requests from all threads are spaced to stay under it
+ENSEMBL_MAX_REQUESTS_PER_SECOND = 15
+
+# Genes per batched UniProt tissue search
+UNIPROT_BATCH_SIZE = 25
+
+# Pooled keep-alive connections per host for the shared HTTP session
+HTTP_POOL_SIZE = 32
+
+# Common subcellular location terms used by _parse_location_from_text
+SUBCELLULAR_LOCATION_TERMS = {
+    'nucleus': 'Nucleus',
+    'nuclear': 'Nucleus',
+    'cytoplasm': 'Cytoplasm',
+    'cytoplasmic': 'Cytoplasm',
+    'mitochondria': 'Mitochondrion',
+    'mitochondrial': 'Mitochondrion',
+    'membrane': 'Membrane',
+    'plasma membrane': 'Plasma membrane',
+    'cell membrane': 'Cell membrane',
+    'endoplasmic reticulum': 'Endoplasmic reticulum',
+    'er': 'Endoplasmic reticulum',
+    'golgi': 'Golgi apparatus',
+    'ribosome': 'Ribosome',
+    'ribosomal': 'Ribosome',
+    'lysosome': 'Lysosome',
+    'lysosomal': 'Lysosome',
+    'peroxisome': 'Peroxisome',
+    'secreted': 'Secreted',
+    'extracellular': 'Extracellular'
+}
+
+# Comprehensive tissue keyword mapping used by _extract_tissues_from_text
+TISSUE_KEYWORDS = {
+    'brain': 'Brain',
+    'cerebral': 'Brain',
+    'neuronal': 'Brain',
+    'cortex': 'Brain cortex',
+    'hippocampus': 'Hippocampus',
+    'liver': 'Liver',
+    'hepatic': 'Liver',
+    'hepatocyte': 'Liver',
+    'kidney': 'Kidney',
+    'renal': 'Kidney',
+    'heart': 'Heart',
+    'cardiac': 'Heart',
+    'myocardium': 'Heart muscle',
+    'lung': 'Lung',
+    'pulmonary': 'Lung',
+    'muscle': 'Muscle',
+    'skeletal muscle': 'Skeletal muscle',
+    'smooth muscle': 'Smooth muscle',
+    'skin': 'Skin',
+    'dermal': 'Skin',
+    'epidermis': 'Skin',
+    'blood': 'Blood',
+    'plasma': 'Blood',
+    'serum': 'Blood',
+    'bone': 'Bone',
+    'skeletal': 'Bone',
+    'testis': 'Testis',
+    'ovary': 'Ovary',
+    'ovarian': 'Ovary',
+    'breast': 'Breast',
+    'mammary': 'Breast',
+    'prostate': 'Prostate',
+    'pancreas': 'Pancreas',
+    'pancreatic': 'Pancreas',
+    'thyroid': 'Thyroid',
+    'adrenal': 'Adrenal gland',
+    'spleen': 'Spleen',
+    'lymph': 'Lymphoid tissue',
+    'intestine': 'Intestine',
+    'colon': 'Colon',
+    'stomach': 'Stomach',
+    'gastric': 'Stomach',
+    'esophagus': 'Esophagus',
+    'trachea': 'Trachea',
+    'bladder': 'Bladder',
+    'uterus': 'Uterus',
+    'placenta': 'Placenta',
+    'eye': 'Eye',
+    'retina': 'Retina',
+    'cornea': 'Cornea'
+}
+
+# Substring patterns used to validate location and tissue names scraped from HPA
+LOCATION_CORRUPTION_PATTERN = re.compile('|'.join(map(re.escape, [
+    'javascript', 'function', 'document', 'window', 'var ',
+    'html', 'css', 'style', 'class=', 'id=', '{', '}',
+    'position:', 'width:', 'height:', 'px', 'em',
+    'humanproteome', 'proteinatlas'
+])))
+VALID_LOCATION_PATTERN = re.compile('|'.join([
+    'nucleus', 'cytoplasm', 'membrane', 'mitochondria', 'endoplasmic',
+    'golgi', 'ribosome', 'lysosome', 'peroxisome', 'secreted',
+    'extracellular', 'plasma', 'nuclear', 'cytoplasmic', 'vesicle',
+    'organelle', 'compartment', 'reticulum', 'apparatus'
+]))
+TISSUE_CORRUPTION_PATTERN = re.compile('javascript|function|document|humanproteome')
+HPA_CORRUPTION_PATTERN = re.compile('|'.join(map(re.escape, [
+    'humanproteome', 'position:', 'collision:', 'width:',
+    'javascript', 'function', '{', '}', 'var ', 'document.',
+    'sub_section', 'appendelem', 'htmlelement', 'nodelist'
+])))
+
+# Antibody reliability terms and their scores (0-5), matched in one scan by _calculate_reliability_score
+RELIABILITY_TERM_SCORES = {
+    'high': 5, 'excellent': 5, 'validated': 5,
+    'good': 4, 'reliable': 4,
+    'medium': 3, 'moderate': 3,
+    'low': 2, 'poor': 2,
+    'unknown': 1, 'uncertain': 1
+}
+RELIABILITY_TERM_PATTERN = re.compile('|'.join(RELIABILITY_TERM_SCORES))
+
+# COMPARTMENTS result columns and the values written when no data is found
+COMPARTMENTS_NO_VALUE = {
+    'compartments_primary_location': "NO VALUE FOUND",
+    'compartments_primary_confidence': 0,  # Numerical 0 for no confidence
+    'compartments_all_locations': "NO VALUE FOUND",
+    'compartments_confidence_scores': "NO VALUE FOUND",
+    'compartments_evidence_types': "NO VALUE FOUND",
+    'compartments_data_sources': "NO VALUE FOUND"
+}
+
+# HPA result columns and the values written when no data is found
+HPA_NO_VALUE = {
+    'hpa_primary_tissue': "NO VALUE FOUND",
+    'hpa_expression_level': "NO VALUE FOUND",
+    'hpa_all_tissues': "NO VALUE FOUND",
+    'hpa_subcellular_location': "NO VALUE FOUND",
+    'hpa_antibody_reliability': 0,  # Numerical 0 for unknown reliability
+    'hpa_data_source': "NO VALUE FOUND"
+}
+
+# Literature location keywords (as bytes for scanning raw PubMed responses) and their standardized names
+ABSTRACT_LOCATION_KEYWORDS = {
+    b'nucleus': 'Nucleus',
+    b'nuclear': 'Nucleus',
+    b'cytoplasm': 'Cytoplasm',
+    b'cytoplasmic': 'Cytoplasm',
+    b'mitochondria': 'Mitochondrion',
+    b'mitochondrial': 'Mitochondrion',
+    b'endoplasmic reticulum': 'Endoplasmic reticulum',
+    b'er': 'Endoplasmic reticulum',
+    b'golgi': 'Golgi apparatus',
+    b'membrane': 'Membrane',
+    b'plasma membrane': 'Cell membrane',
+    b'cell membrane': 'Cell membrane',
+    b'ribosome': 'Ribosome',
+    b'ribosomal': 'Ribosome',
+    b'lysosome': 'Lysosome',
+    b'lysosomal': 'Lysosome',
+    b'peroxisome': 'Peroxisome',
+    b'secreted': 'Secreted',
+    b'extracellular': 'Extracellular region'
+}
+
+# State of the HPA strategy running on the current thread (see _run_hpa_strategy)
+_strategy_state = threading.local()
+
+
+class _StrategyStopped(requests.RequestException):
+    """Raised in place of a request once a higher-priority HPA strategy has settled the gene"""
+
+
+class _StrategyHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that flags the running HPA strategy when one of its requests fails, and refuses
+    new requests once the strategy has been told to stop"""
+    
+    def send(self, request, **kwargs):
+        stop = getattr(_strategy_state, 'stop', None)
+        if stop is not None and stop.is_set():
+            raise _StrategyStopped("HPA lookup already settled by a higher-priority strategy")
+        
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            _strategy_state.failed = True
+            raise
+        
+        # Rate limiting and server errors say nothing about whether the gene has data
+        if response.status_code == 429 or response.status_code >= 500:
+            _strategy_state.failed = True
+        return response
+
 class HumanProteinAnalyzerManager:
     """Enhanced version with comprehensive COMPARTMENTS data extraction"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self.ensembl_mapper = EnsemblGeneMapper()
-        self.session = requests.Session()
+        self.session = self._create_session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
@@ -24,6 +264,41 @@ class HumanProteinAnalyzerManager:
             'Upgrade-Insecure-Requests': '1'
         })
         
+        # Worker pool for fetching the HPA strategies of a gene concurrently, created per HPA analysis
+        self.hpa_executor = None
+        
+        # UniProt entries prefetched by gene name for the UniProt tissue strategy
+        self.uniprot_batch_cache = {}
+        
+        # Per-run HPA results by gene name (None for genes with no reliable data)
+        self.hpa_result_cache = {}
+        
+        # Parsed locations by lowercased staining text - the same few phrases recur across antibodies
+        self.location_text_cache = {}
+        
+        # Genes known to have no HPA data from earlier runs (gene -> timestamp) and misses found this run
+        self.hpa_missing = self._load_hpa_missing()
+        self.hpa_new_missing = set()
+        
+        # HPA XML element handlers by tag, dispatched by _get_hpa_xml_enhanced
+        self.hpa_xml_handlers = {
+            'subcellularLocation': self._handle_hpa_subcellular_location,
+            'location': self._handle_hpa_location,
+            'subcellular': self._handle_hpa_location,
+            'cellularComponent': self._handle_hpa_location,
+            'localization': self._handle_hpa_location,
+            'compartment': self._handle_hpa_location,
+            'immunofluorescence': self._handle_hpa_immunofluorescence,
+            'antibody': self._handle_hpa_antibody,
+            'go': self._handle_hpa_go,
+            'tissue': self._handle_hpa_tissue,
+            'expression': self._handle_hpa_expression
+        }
+        
+        # Tissue keyword automaton for single-pass text matching (None if pyahocorasick is missing)
+        self.tissue_automaton = self._build_keyword_automaton(TISSUE_KEYWORDS)
+        self.location_automaton = self._build_keyword_automaton(SUBCELLULAR_LOCATION_TERMS)
+        
         # COMPARTMENTS confidence mapping
         self.confidence_map = {
             5: "★★★★★", 4: "★★★★☆", 3: "★★★☆☆", 
@@ -32,6 +307,46 @@ class HumanProteinAnalyzerManager:
         
         self.logger.info("Enhanced HumanProteinAnalyzerManager initialized")
     
+    def _create_session(self):
+        """Create the HTTP session, caching responses on disk when requests-cache is available"""
+        if requests_cache is None:
+            session = requests.Session()
+        else:
+            self.logger.info(f"Caching human protein API responses in {HTTP_CACHE['cache_name']}")
+            session = requests_cache.CachedSession(
+                HTTP_CACHE['cache_name'],
+                backend=HTTP_CACHE['backend'],
+                expire_after=HTTP_CACHE['expire_after']
+            )
+        
+        # Keep connections alive across the concurrent strategy requests and retry transient server errors
+        adapter = _StrategyHTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504))
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+    
+    def _load_json(self, response):
+        """Decode a JSON response body, using orjson directly on the bytes when available"""
+        if orjson is None:
+            return response.json()
+        return orjson.loads(response.content)
+    
+    def _build_keyword_automaton(self, keyword_map):
+        """Build an Aho-Corasick automaton mapping each keyword to its standardized name"""
+        if ahocorasick is None:
+            self.logger.debug("pyahocorasick not available, using per-keyword text matching")
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, standard_name in keyword_map.items():
+            automaton.add_word(keyword, standard_name)
+        automaton.make_automaton()
+        return automaton
+    
     def run_human_analysis(self, data, options, progress_callback=None):
         """Run human-specific analyses with enhanced COMPARTMENTS extraction"""
         results = data['results']
@@ -61,7 +376,15 @@ class HumanProteinAnalyzerManager:
         # Run HPA analysis if requested  
         if options.get('hpa', False):
             self.logger.info("Starting HPA analysis...")
-            self._run_hpa_analysis_fixed(results, gene_names, progress_callback, total_genes)
+            # With caching turned off, genes recorded as missing by earlier runs are looked up again
+            known_missing = self.hpa_missing if options.get('use_cache', True) else {}
+            self.hpa_executor = ThreadPoolExecutor(max_workers=HPA_MAX_WORKERS)
+            try:
+                self._run_hpa_analysis_fixed(results, gene_names, progress_callback, total_genes, known_missing)
+            finally:
+                # Stopped stragglers finish their current request on their own, so don't wait for them
+                self.hpa_executor.shutdown(wait=False)
+                self.hpa_executor = None
         
         # Log final statistics
         self._log_analysis_statistics(results, options)
@@ -73,6 +396,9 @@ class HumanProteinAnalyzerManager:
         """Enhanced COMPARTMENTS analysis with comprehensive data extraction"""
         self.logger.info("Running enhanced COMPARTMENTS analysis with multiple data sources")
         
+        # Collect values per column and write each column once after the loop
+        columns = {field: np.empty(total_genes, dtype=object) for field in COMPARTMENTS_NO_VALUE}
+        
         for i, gene_name in enumerate(gene_names):
             if progress_callback:
                 progress = 5 + (15 * (i + 1) / total_genes)
@@ -84,47 +410,51 @@ class HumanProteinAnalyzerManager:
                 
                 # Try multiple approaches to get comprehensive COMPARTMENTS data
                 compartments_data = self._get_compartments_comprehensive(clean_gene)
-                self._process_compartments_data_enhanced(results, i, compartments_data, clean_gene)
+                row = self._process_compartments_data_enhanced(compartments_data, clean_gene)
                 
             except Exception as e:
                 self.logger.error(f"Enhanced COMPARTMENTS error for {gene_name}: {e}")
-                self._set_compartments_no_value(results, i)
+                row = COMPARTMENTS_NO_VALUE
+            
+            for field, value in row.items():
+                columns[field][i] = value
             
             time.sleep(RATE_LIMITS.get('compartments', 0.3))
+        
+        for field, values in columns.items():
+            if field == 'compartments_primary_confidence':
+                # Direct API scores are passed through raw and need not be integral (or numeric);
+                # unparseable scores become 0 (no confidence) so the column never holds NA
+                scores = pd.to_numeric(pd.Series(values, index=results.index), errors='coerce').fillna(0)
+                results[field] = scores.astype('int64') if (scores % 1 == 0).all() else scores.astype('float64')
+            else:
+                results[field] = values
     
     def _get_compartments_comprehensive(self, gene_name):
         """Get comprehensive COMPARTMENTS data using multiple strategies"""
         all_locations = []
+        deadline = time.monotonic() + REQUEST_TIMEOUTS['compartments_total']
         
-        # Strategy 1: Direct COMPARTMENTS API (if available)
-        compartments_direct = self._get_compartments_direct_api(gene_name)
-        if compartments_direct:
-            all_locations.extend(compartments_direct)
-            self.logger.debug(f"COMPARTMENTS direct API: {len(compartments_direct)} locations for {gene_name}")
-        
-        # Strategy 2: Jensen Lab COMPARTMENTS via STRING/UniProt
-        compartments_jensen = self._get_compartments_jensen_lab(gene_name)
-        if compartments_jensen:
-            all_locations.extend(compartments_jensen)
-            self.logger.debug(f"Jensen Lab COMPARTMENTS: {len(compartments_jensen)} locations for {gene_name}")
-        
-        # Strategy 3: Enhanced UniProt subcellular location
-        uniprot_data = self._get_uniprot_subcellular_enhanced(gene_name)
-        if uniprot_data:
-            all_locations.extend(uniprot_data)
-            self.logger.debug(f"UniProt enhanced: {len(uniprot_data)} locations for {gene_name}")
-        
-        # Strategy 4: GO Cellular Component (enhanced)
-        go_data = self._get_go_cellular_component_enhanced(gene_name)
-        if go_data:
-            all_locations.extend(go_data)
-            self.logger.debug(f"GO enhanced: {len(go_data)} locations for {gene_name}")
-        
-        # Strategy 5: Literature mining (PubMed abstracts)
-        literature_data = self._get_literature_compartments(gene_name)
-        if literature_data:
-            all_locations.extend(literature_data)
-            self.logger.debug(f"Literature mining: {len(literature_data)} locations for {gene_name}")
+        # Strategies in priority order: direct COMPARTMENTS API, Jensen Lab via STRING,
+        # UniProt subcellular location, GO Cellular Component, literature mining
+        strategies = [
+            ("COMPARTMENTS direct API", self._get_compartments_direct_api),
+            ("Jensen Lab COMPARTMENTS", self._get_compartments_jensen_lab),
+            ("UniProt enhanced", self._get_uniprot_subcellular_enhanced),
+            ("GO enhanced", self._get_go_cellular_component_enhanced),
+            ("Literature mining", self._get_literature_compartments)
+        ]
+        
+        for label, strategy in strategies:
+            # Stop once the per-gene budget is spent so one slow endpoint can't stall the run
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"COMPARTMENTS time budget exhausted for {gene_name}, skipping {label}")
+                break
+            
+            locations = strategy(gene_name)
+            if locations:
+                all_locations.extend(locations)
+                self.logger.debug(f"{label}: {len(locations)} locations for {gene_name}")
         
         # Consolidate and rank data
         if all_locations:
@@ -154,7 +484,7 @@ class HumanProteinAnalyzerManager:
                         'limit': 20
                     }
                     
-                    response = self.session.get(url, params=params, timeout=15)
+                    response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
                     
                     if response.status_code == 200:
                         data = response.json()
@@ -201,7 +531,7 @@ class HumanProteinAnalyzerManager:
                     'caller_identity': 'ProtMerge'
                 }
                 
-                response = self.session.get(url, params=params, timeout=20)
+                response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
                 
                 if response.status_code == 200:
                     data = response.json()
@@ -242,7 +572,7 @@ class HumanProteinAnalyzerManager:
                 'caller_identity': 'ProtMerge'
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
             
             if response.status_code == 200:
                 data = response.json()
@@ -265,7 +595,7 @@ class HumanProteinAnalyzerManager:
                 'size': 3  # Get top 3 results
             }
             
-            response = self.session.get(url, params=params, timeout=15)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
             
             if response.status_code == 200:
                 data = response.json()
@@ -332,7 +662,7 @@ class HumanProteinAnalyzerManager:
                 'size': 3
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
             
             if response.status_code == 200:
                 data = response.json()
@@ -368,7 +698,7 @@ class HumanProteinAnalyzerManager:
                 'includeFields': 'goName,evidenceCode,reference,qualifier'
             }
             
-            response = self.session.get(url, params=params, timeout=20)
+            response = self.session.get(url, params=params, timeout=REQUEST_TIMEOUTS['compartments'])
             
             if response.status_code == 200:
                 data = response.json()
@@ -420,7 +750,7 @@ class HumanProteinAnalyzerManager:
                 'sort': 'relevance'
             }
             
-            search_response = self.session.get(search_url, params=search_params, timeout=15)
+            search_response = self.session.get(search_url, params=search_params, timeout=REQUEST_TIMEOUTS['compartments'])
             
             if search_response.status_code == 200:
                 search_data = search_response.json()
@@ -435,12 +765,14 @@ class HumanProteinAnalyzerManager:
                         'retmode': 'xml'
                     }
                     
-                    fetch_response = self.session.get(fetch_url, params=fetch_params, timeout=20)
+                    fetch_response = self.session.get(fetch_url, params=fetch_params, timeout=REQUEST_TIMEOUTS['compartments'], stream=True)
                     
-                    if fetch_response.status_code == 200:
-                        # Parse abstracts for location keywords
-                        locations = self._extract_locations_from_abstracts(fetch_response.text, gene_name)
-                        return locations
+                    with fetch_response:
+                        if fetch_response.status_code == 200:
+                            # Parse abstracts for location keywords as the body streams in
+                            byte_chunks = fetch_response.iter_content(chunk_size=65536)
+                            locations = self._extract_locations_from_abstracts(byte_chunks, gene_name)
+                            return locations
             
             return None
             
@@ -448,41 +780,12 @@ class HumanProteinAnalyzerManager:
             self.logger.debug(f"Literature mining failed for {gene_name}: {e}")
             return None
     
-    def _extract_locations_from_abstracts(self, xml_text, gene_name):
-        """Extract location information from PubMed abstracts"""
+    def _extract_locations_from_abstracts(self, byte_chunks, gene_name):
+        """Extract location information from streamed PubMed abstracts"""
         try:
             locations = []
             
-            # Define location keywords and their standardized names
-            location_keywords = {
-                'nucleus': 'Nucleus',
-                'nuclear': 'Nucleus',
-                'cytoplasm': 'Cytoplasm',
-                'cytoplasmic': 'Cytoplasm',
-                'mitochondria': 'Mitochondrion',
-                'mitochondrial': 'Mitochondrion',
-                'endoplasmic reticulum': 'Endoplasmic reticulum',
-                'er': 'Endoplasmic reticulum',
-                'golgi': 'Golgi apparatus',
-                'membrane': 'Membrane',
-                'plasma membrane': 'Cell membrane',
-                'cell membrane': 'Cell membrane',
-                'ribosome': 'Ribosome',
-                'ribosomal': 'Ribosome',
-                'lysosome': 'Lysosome',
-                'lysosomal': 'Lysosome',
-                'peroxisome': 'Peroxisome',
-                'secreted': 'Secreted',
-                'extracellular': 'Extracellular region'
-            }
-            
-            # Convert to lowercase for searching
-            text_lower = xml_text.lower()
-            
-            found_locations = set()
-            for keyword, standard_name in location_keywords.items():
-                if keyword in text_lower:
-                    found_locations.add(standard_name)
+            found_locations = self._scan_abstracts_stream(byte_chunks)
             
             # Convert to location objects
             for location in found_locations:
@@ -500,6 +803,24 @@ class HumanProteinAnalyzerManager:
             self.logger.debug(f"Abstract parsing failed: {e}")
             return None
     
+    def _scan_abstracts_stream(self, byte_chunks):
+        """Scan raw response chunks for location keywords without holding the whole body"""
+        found_locations = set()
+        
+        # Keep the last (longest keyword - 1) bytes so matches spanning two chunks are found
+        overlap = max(len(keyword) for keyword in ABSTRACT_LOCATION_KEYWORDS) - 1
+        tail = b''
+        
+        for chunk in byte_chunks:
+            # Keywords are ASCII, so lowercasing the raw bytes is enough
+            window = tail + chunk.lower()
+            for keyword, standard_name in ABSTRACT_LOCATION_KEYWORDS.items():
+                if standard_name not in found_locations and keyword in window:
+                    found_locations.add(standard_name)
+            tail = window[-overlap:]
+        
+        return found_locations
+    
     def _consolidate_compartments_data(self, all_locations, gene_name):
         """Consolidate and rank COMPARTMENTS data from multiple sources with practical output format"""
         try:
@@ -542,11 +863,10 @@ class HumanProteinAnalyzerManager:
             self.logger.error(f"Error consolidating COMPARTMENTS data for {gene_name}: {e}")
             return None
     
-    def _process_compartments_data_enhanced(self, results, idx, data, gene_name):
-        """Process COMPARTMENTS data with practical, sortable format"""
+    def _process_compartments_data_enhanced(self, data, gene_name):
+        """Process COMPARTMENTS data with practical, sortable format, returning column values"""
         if not data:
-            self._set_compartments_no_value(results, idx)
-            return
+            return COMPARTMENTS_NO_VALUE
         
         try:
             # Get primary (highest confidence) location
@@ -567,19 +887,21 @@ class HumanProteinAnalyzerManager:
             unique_sources = list(dict.fromkeys(all_sources))
             unique_evidences = list(dict.fromkeys(all_evidences))
             
-            # Store in results with practical format
-            results.at[idx, 'compartments_primary_location'] = primary_location
-            results.at[idx, 'compartments_primary_confidence'] = primary_confidence
-            results.at[idx, 'compartments_all_locations'] = " | ".join(all_locations)
-            results.at[idx, 'compartments_confidence_scores'] = " | ".join(all_confidence_scores)
-            results.at[idx, 'compartments_evidence_types'] = " | ".join(unique_evidences)
-            results.at[idx, 'compartments_data_sources'] = " | ".join(unique_sources)
-            
             self.logger.info(f"COMPARTMENTS success for {gene_name}: Primary={primary_location} (confidence={primary_confidence}), Total={len(data)} locations")
             
+            # Practical format for the results columns
+            return {
+                'compartments_primary_location': primary_location,
+                'compartments_primary_confidence': primary_confidence,
+                'compartments_all_locations': " | ".join(all_locations),
+                'compartments_confidence_scores': " | ".join(all_confidence_scores),
+                'compartments_evidence_types': " | ".join(unique_evidences),
+                'compartments_data_sources': " | ".join(unique_sources)
+            }
+            
         except Exception as e:
             self.logger.error(f"Error processing COMPARTMENTS data for {gene_name}: {e}")
-            self._set_compartments_no_value(results, idx)
+            return COMPARTMENTS_NO_VALUE
     
     # Helper methods
     def _convert_confidence_to_stars(self, confidence_score):
@@ -647,18 +969,25 @@ class HumanProteinAnalyzerManager:
     # Keep existing methods for HPA analysis and initialization
     def _initialize_human_columns(self, results):
         """Initialize columns for human protein data"""
-        for key in HUMAN_PROTEIN_COLUMNS.keys():
-            if key not in results.columns:
-                results[key] = "NO VALUE FOUND"
+        # Includes the detailed column for enhanced COMPARTMENTS
+        missing = [key for key in [*HUMAN_PROTEIN_COLUMNS, 'compartments_detailed'] if key not in results.columns]
         
-        # Add new detailed column for enhanced COMPARTMENTS
-        if 'compartments_detailed' not in results.columns:
-            results['compartments_detailed'] = "NO VALUE FOUND"
+        # Add every missing column in one assignment rather than one insert per column
+        if missing:
+            results[missing] = np.full((len(results), len(missing)), "NO VALUE FOUND", dtype=object)
     
-    def _run_hpa_analysis_fixed(self, results, gene_names, progress_callback, total_genes):
+    def _run_hpa_analysis_fixed(self, results, gene_names, progress_callback, total_genes, known_missing):
         """Enhanced HPA analysis with multiple data retrieval strategies"""
         self.logger.info("Running enhanced HPA analysis with multiple approaches")
         
+        # Fetch UniProt tissue annotations and Ensembl IDs for all genes up front in a few batched requests
+        clean_genes = [str(gene_name).strip() for gene_name in gene_names]
+        self._get_uniprot_tissue_enhanced_batch(clean_genes)
+        self.ensembl_mapper.get_ensembl_ids(gene_name for gene_name in clean_genes if gene_name not in known_missing)
+        
+        # Collect values per column and write each column once after the loop
+        columns = {field: np.empty(total_genes, dtype=object) for field in HPA_NO_VALUE}
+        
         for i, gene_name in enumerate(gene_names):
             if progress_callback:
                 progress = 20 + (15 * (i + 1) / total_genes)
@@ -669,200 +998,375 @@ class HumanProteinAnalyzerManager:
                 self.logger.debug(f"HPA: Processing {clean_gene}")
                 
                 # Try multiple HPA data retrieval strategies
-                hpa_data = self._get_hpa_comprehensive(clean_gene)
-                self._process_hpa_data_enhanced(results, i, hpa_data, clean_gene)
+                hpa_data = self._get_hpa_comprehensive(clean_gene, known_missing)
+                row = self._process_hpa_data_enhanced(hpa_data, clean_gene)
                 
             except Exception as e:
                 self.logger.error(f"HPA error for {gene_name}: {e}")
-                self._set_hpa_no_value(results, i)
+                row = HPA_NO_VALUE
+            
+            for field, value in row.items():
+                columns[field][i] = value
             
             time.sleep(RATE_LIMITS.get('hpa', 1.0))
+        
+        for field, values in columns.items():
+            if field == 'hpa_antibody_reliability':
+                results[field] = pd.array(values, dtype='Int8')
+            else:
+                results[field] = values
+        
+        self._save_hpa_missing()
+        self.ensembl_mapper.save_cache()
     
-    def _get_hpa_comprehensive(self, gene_name):
-        """Comprehensive HPA data retrieval using multiple strategies"""
-        # Strategy 1: Direct HPA API/XML (if available)
-        ensembl_id = self.ensembl_mapper.get_ensembl_id(gene_name)
-        if ensembl_id:
-            hpa_data = self._get_hpa_xml_enhanced(ensembl_id, gene_name)
+    def _get_hpa_comprehensive(self, gene_name, known_missing):
+        """Comprehensive HPA data retrieval using multiple strategies fetched concurrently"""
+        if gene_name in self.hpa_result_cache:
+            return self.hpa_result_cache[gene_name]
+        
+        # Skip every strategy for genes that recently returned nothing
+        if gene_name in known_missing:
+            self.logger.debug(f"Skipping HPA lookup for {gene_name}: no data found in a recent run")
+            return None
+        
+        hpa_data, answered = self._fetch_hpa_comprehensive(gene_name)
+        self.hpa_result_cache[gene_name] = hpa_data
+        
+        # Only a gene every strategy answered without a failed request is known to have no data
+        if hpa_data is None and answered:
+            self.hpa_new_missing.add(gene_name)
+        return hpa_data
+    
+    def _load_hpa_missing(self):
+        """Load genes recently found to have no HPA data, dropping expired entries"""
+        cutoff = time.time() - HPA_MISSING_CACHE['expire_after']
+        try:
+            with open(HPA_MISSING_CACHE['path'], 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return {gene: timestamp for gene, timestamp in entries.items() if timestamp >= cutoff}
+        except (OSError, ValueError, AttributeError, TypeError):
+            # Missing, unreadable or not shaped like {gene: timestamp} - start afresh
+            return {}
+    
+    def _save_hpa_missing(self):
+        """Persist genes that returned no HPA data this run"""
+        if not self.hpa_new_missing:
+            return
+        
+        # If nothing succeeded this run the misses are more likely network failures than absent genes
+        if not any(data is not None for data in self.hpa_result_cache.values()):
+            self.logger.warning("No HPA lookups succeeded this run, not recording genes as missing")
+            return
+        
+        now = time.time()
+        self.hpa_missing.update(dict.fromkeys(self.hpa_new_missing, now))
+        self.hpa_new_missing.clear()
+        
+        try:
+            with open(HPA_MISSING_CACHE['path'], 'w', encoding='utf-8') as f:
+                json.dump(self.hpa_missing, f)
+        except OSError as e:
+            self.logger.debug(f"Could not save HPA missing-gene cache: {e}")
+    
+    def _fetch_hpa_comprehensive(self, gene_name):
+        """Query all HPA strategies for a gene - returns the first valid result by priority (or None),
+        and whether every strategy answered without a failed request"""
+        # The strategies are independent lookups, so fire them all at once and settle on the
+        # highest-priority valid result as soon as every strategy ranked above it has finished;
+        # the lower-ranked ones still running are then stopped before their next request
+        stop = threading.Event()
+        futures = {
+            self.hpa_executor.submit(self._run_hpa_strategy, method, gene_name, stop): rank
+            for rank, (label, method) in enumerate(HPA_STRATEGIES)
+        }
+        settled = [False] * len(HPA_STRATEGIES)
+        results = [None] * len(HPA_STRATEGIES)
+        next_rank = 0
+        answered = True
+        
+        for future in as_completed(futures):
+            rank = futures[future]
+            label = HPA_STRATEGIES[rank][0]
+            settled[rank] = True
+            try:
+                hpa_data, failed = future.result()
+            except Exception as e:
+                self.logger.debug(f"{label} failed for {gene_name}: {e}")
+                hpa_data, failed = None, True
+            answered = answered and not failed
+            
             if hpa_data and self._is_valid_hpa_data(hpa_data):
-                self.logger.debug(f"HPA XML success for {gene_name}")
-                return hpa_data
-        
-        # Strategy 2: HPA web scraping (careful parsing)
-        hpa_data = self._get_hpa_web_safe(gene_name)
-        if hpa_data and self._is_valid_hpa_data(hpa_data):
-            self.logger.debug(f"HPA web scraping success for {gene_name}")
-            return hpa_data
-        
-        # Strategy 3: Expression Atlas as HPA alternative
-        atlas_data = self._get_expression_atlas_enhanced(gene_name)
-        if atlas_data and self._is_valid_hpa_data(atlas_data):
-            self.logger.debug(f"Expression Atlas success for {gene_name}")
-            return atlas_data
-        
-        # Strategy 4: GTEx (Genotype-Tissue Expression) data
-        gtex_data = self._get_gtex_data(gene_name)
-        if gtex_data and self._is_valid_hpa_data(gtex_data):
-            self.logger.debug(f"GTEx success for {gene_name}")
-            return gtex_data
-        
-        # Strategy 5: UniProt tissue specificity (fallback)
-        uniprot_tissue = self._get_uniprot_tissue_enhanced(gene_name)
-        if uniprot_tissue and self._is_valid_hpa_data(uniprot_tissue):
-            self.logger.debug(f"UniProt tissue success for {gene_name}")
-            return uniprot_tissue
+                results[rank] = hpa_data
+            
+            while next_rank < len(HPA_STRATEGIES) and settled[next_rank]:
+                if results[next_rank] is not None:
+                    stop.set()
+                    for straggler in futures:
+                        straggler.cancel()
+                    self.logger.debug(f"{HPA_STRATEGIES[next_rank][0]} success for {gene_name}")
+                    return results[next_rank], answered
+                next_rank += 1
         
         self.logger.debug(f"No reliable HPA data found for {gene_name}")
-        return None
+        return None, answered
+    
+    def _run_hpa_strategy(self, method, gene_name, stop):
+        """Run one HPA strategy on a worker thread - returns its result and whether any of its requests failed"""
+        _strategy_state.stop = stop
+        _strategy_state.failed = False
+        try:
+            hpa_data = getattr(self, method)(gene_name)
+            return hpa_data, _strategy_state.failed
+        finally:
+            _strategy_state.stop = None
+    
+    def _get_hpa_xml_by_gene(self, gene_name):
+        """Resolve the Ensembl ID for a gene and fetch its HPA entry (TSV first, XML as fallback)"""
+        ensembl_id = self.ensembl_mapper.get_ensembl_id(gene_name)
+        if not ensembl_id:
+            # A symbol lookup that failed says nothing about whether HPA has the gene
+            if gene_name in self.ensembl_mapper.unresolved:
+                _strategy_state.failed = True
+            return None
+        
+        # The per-gene TSV is far smaller and cheaper to parse than the XML; use it when it
+        # covers both tissues and subcellular locations
+        tsv_data = self._get_hpa_tsv(ensembl_id, gene_name)
+        if tsv_data and tsv_data['tissues'] and tsv_data['subcellular_locations']:
+            return tsv_data
+        
+        return self._get_hpa_xml_enhanced(ensembl_id, gene_name)
+    
+    def _get_hpa_tsv(self, ensembl_id, gene_name):
+        """HPA per-gene TSV summary: RNA tissue specificity, subcellular location and reliability"""
+        try:
+            url = f"https://www.proteinatlas.org/{ensembl_id}.tsv"
+            
+            # Only the header and first data row are needed, so read lines off the stream and
+            # stop there rather than decoding the whole body into one string
+            response = self.session.get(url, timeout=30, stream=True)
+            
+            with response:
+                if response.status_code != 200:
+                    self.logger.debug(f"HPA TSV request failed for {ensembl_id}: HTTP {response.status_code}")
+                    return None
+                
+                row = next(csv.DictReader(response.iter_lines(decode_unicode=True), delimiter='\t'), None)
+            
+            if not row:
+                return None
+            
+            tissues = []
+            expression_levels = []
+            
+            # e.g. "liver: 1234.5;kidney: 56.7"
+            for entry in (row.get('RNA tissue specific nTPM') or '').split(';'):
+                if ':' not in entry:
+                    continue
+                tissue, ntpm = entry.split(':', 1)
+                tissue = tissue.strip().capitalize()
+                if self._is_valid_tissue_name(tissue):
+                    tissues.append(tissue)
+                    expression_levels.append(f"{tissue}:{ntpm.strip()} nTPM")
+            
+            locations = []
+            for column in ('Subcellular main location', 'Subcellular additional location', 'Subcellular location'):
+                for location in (row.get(column) or '').split(','):
+                    location = location.strip()
+                    if location and location not in locations and self._is_valid_location_name(location):
+                        locations.append(location)
+            
+            antibody_info = [row[column] for column in ('Reliability (IF)', 'Reliability (IH)') if row.get(column)]
+            
+            return {
+                'gene_name': gene_name,
+                'tissues': tissues[:20],
+                'subcellular_locations': locations[:10],
+                'expression_levels': expression_levels[:20],
+                'antibody_info': antibody_info,
+                'source': 'HPA_TSV'
+            }
+            
+        except Exception as e:
+            self.logger.debug(f"HPA TSV query failed for {ensembl_id}: {e}")
+            return None
     
     def _get_hpa_xml_enhanced(self, ensembl_id, gene_name):
         """Enhanced HPA XML parsing with better subcellular location extraction"""
         try:
             url = f"https://www.proteinatlas.org/{ensembl_id}.xml"
         
-            response = self.session.get(url, timeout=30)
-        
-            if response.status_code == 200:
-                try:
-                    root = ET.fromstring(response.content)
-                
-                    tissues = set()
-                    locations = set()
-                    expression_levels = []
-                    antibody_info = []
-                
-                    # FIXED: Enhanced subcellular location extraction with multiple approaches
-                
-                    # Approach 1: Look for subcellular location elements
-                    for loc_elem in root.findall('.//subcellularLocation'):
-                        # Try different ways to get location name
-                        loc_name = None
-                    
-                        # Try as attribute
-                        if loc_elem.get('name'):
-                            loc_name = loc_elem.get('name')
-                        # Try as text content
-                        elif loc_elem.text:
-                            loc_name = loc_elem.text.strip()
-                        # Try nested elements
-                        else:
-                            for child in loc_elem:
-                                if child.text and child.text.strip():
-                                    loc_name = child.text.strip()
-                                    break
+            # Stream the body straight into the parser so parsing overlaps the download
+            response = self.session.get(url, timeout=30, stream=True)
+            response.raw.decode_content = True
+            
+            with response:
+                if response.status_code == 200:
+                    try:
+                        # Dicts double as insertion-ordered sets, capped at what is returned below
+                        found = {
+                            'tissues': {},
+                            'locations': {},
+                            'expression_levels': [],
+                            'antibody_info': []
+                        }
                     
-                        if loc_name and self._is_valid_location_name(loc_name):
-                            locations.add(loc_name.strip())
-                            self.logger.debug(f"Found subcellular location: {loc_name}")
-                
-                    # Approach 2: Look for location in different XML structures
-                    location_xpath_patterns = [
-                        './/location',
-                        './/subcellular',
-                        './/cellularComponent',
-                        './/localization',
-                        './/compartment'
-                    ]
-                
-                    for xpath in location_xpath_patterns:
-                        for elem in root.findall(xpath):
-                            loc_name = self._extract_location_name(elem)
-                            if loc_name and self._is_valid_location_name(loc_name):
-                                locations.add(loc_name)
-                                self.logger.debug(f"Found location via {xpath}: {loc_name}")
-                
-                    # Approach 3: Look in immunofluorescence data
-                    for if_elem in root.findall('.//immunofluorescence'):
-                        location_attr = if_elem.get('location', '')
-                        if location_attr and self._is_valid_location_name(location_attr):
-                            locations.add(location_attr)
-                            self.logger.debug(f"Found IF location: {location_attr}")
+                        # Single streaming pass over the XML, dispatching each element to the handler
+                        # for its tag instead of one findall('.//...') tree walk per pattern. An element
+                        # is freed once no handled element is still open around it, since nothing can need it later.
+                        handlers = self.hpa_xml_handlers
+                        open_targets = 0
                     
-                        # Check nested location elements in IF data
-                        for loc_child in if_elem.findall('.//location'):
-                            loc_name = self._extract_location_name(loc_child)
-                            if loc_name and self._is_valid_location_name(loc_name):
-                                locations.add(loc_name)
-                
-                    # Approach 4: Look in antibody staining data
-                    for antibody_elem in root.findall('.//antibody'):
-                        for staining in antibody_elem.findall('.//staining'):
-                            location_attr = staining.get('location', '')
-                            if location_attr and self._is_valid_location_name(location_attr):
-                                locations.add(location_attr)
+                        for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                            handler = handlers.get(elem.tag)
                         
-                            # Check for location in staining text
-                            if staining.text:
-                                parsed_locations = self._parse_location_from_text(staining.text)
-                                locations.update(parsed_locations)
-                
-                    # Approach 5: Look for GO cellular component terms
-                    for go_elem in root.findall('.//go'):
-                        go_term = go_elem.get('term', '')
-                        go_aspect = go_elem.get('aspect', '')
-                    
-                        if go_aspect.lower() == 'cellular_component' and go_term:
-                            # Clean up GO term
-                            clean_term = go_term.replace('GO:', '').strip()
-                            if self._is_valid_location_name(clean_term):
-                                locations.add(clean_term)
-                                self.logger.debug(f"Found GO cellular component: {clean_term}")
-                
-                    # Extract tissue expression data (existing code)
-                    for tissue_elem in root.findall('.//tissue'):
-                        tissue_name = tissue_elem.get('name', tissue_elem.text)
-                        level = tissue_elem.get('level', 'detected')
+                            if event == 'start':
+                                if handler:
+                                    open_targets += 1
+                                continue
+                        
+                            if handler:
+                                open_targets -= 1
+                                handler(elem, found)
+                            
+                                # Everything past the caps would be sliced off anyway, so stop reading
+                                if (len(found['tissues']) >= HPA_XML_MAX_TISSUES
+                                        and len(found['locations']) >= HPA_XML_MAX_LOCATIONS
+                                        and len(found['expression_levels']) >= HPA_XML_MAX_TISSUES
+                                        and len(found['antibody_info']) >= HPA_XML_MAX_ANTIBODIES):
+                                    break
+                        
+                            if open_targets == 0:
+                                elem.clear()
+                                while elem.getprevious() is not None:
+                                    del elem.getparent()[0]
                     
-                        if tissue_name and self._is_valid_tissue_name(tissue_name):
-                            tissues.add(tissue_name.strip())
-                            if level and level != 'not detected':
-                                expression_levels.append(f"{tissue_name.strip()}:{level}")
-                
-                    # Extract expression data from different XML structures
-                    for expr_elem in root.findall('.//expression'):
-                        tissue = expr_elem.get('tissue', '')
-                        level = expr_elem.get('level', '')
+                        tissues = found['tissues']
+                        locations = found['locations']
+                        expression_levels = found['expression_levels']
+                        antibody_info = found['antibody_info']
                     
-                        if tissue and self._is_valid_tissue_name(tissue):
-                            tissues.add(tissue)
-                            if level != 'not detected':
-                                expression_levels.append(f"{tissue}:{level}")
-                
-                    # Extract antibody reliability information
-                    for antibody_elem in root.findall('.//antibody'):
-                        reliability = antibody_elem.get('reliability', '')
-                        if reliability:
-                            antibody_info.append(reliability)
-                
-                    # Log what we found
-                    if locations:
-                        self.logger.info(f"HPA XML found {len(locations)} subcellular locations for {gene_name}: {list(locations)}")
-                    else:
-                        self.logger.warning(f"HPA XML found no subcellular locations for {gene_name}")
+                        # Log what we found
+                        if locations:
+                            self.logger.info(f"HPA XML found {len(locations)} subcellular locations for {gene_name}: {list(locations)}")
+                        else:
+                            self.logger.warning(f"HPA XML found no subcellular locations for {gene_name}")
                 
-                    if tissues or locations or expression_levels:
-                        return {
-                            'gene_name': gene_name,
-                            'tissues': list(tissues)[:20],
-                            'subcellular_locations': list(locations)[:10],  # This should now have data
-                            'expression_levels': expression_levels[:20],
-                            'antibody_info': antibody_info[:10],
-                            'source': 'HPA_XML'
-                        }
-                    else:
-                        self.logger.warning(f"HPA XML returned no usable data for {gene_name}")
-                        return None
+                        if tissues or locations or expression_levels:
+                            return {
+                                'gene_name': gene_name,
+                                'tissues': list(tissues),
+                                'subcellular_locations': list(locations),  # This should now have data
+                                'expression_levels': expression_levels[:HPA_XML_MAX_TISSUES],
+                                'antibody_info': antibody_info[:HPA_XML_MAX_ANTIBODIES],
+                                'source': 'HPA_XML'
+                            }
+                        else:
+                            self.logger.warning(f"HPA XML returned no usable data for {gene_name}")
+                            return None
             
-                except ET.ParseError as e:
-                    self.logger.debug(f"HPA XML parsing failed for {ensembl_id}: {e}")
+                    except ET.ParseError as e:
+                        self.logger.debug(f"HPA XML parsing failed for {ensembl_id}: {e}")
+                        return None
+                else:
+                    self.logger.debug(f"HPA XML request failed for {ensembl_id}: HTTP {response.status_code}")
                     return None
-            else:
-                self.logger.debug(f"HPA XML request failed for {ensembl_id}: HTTP {response.status_code}")
-                return None
             
         except Exception as e:
             self.logger.debug(f"HPA XML query failed for {ensembl_id}: {e}")
             return None
+    
+    @staticmethod
+    def _add_capped(bucket, value, limit):
+        """Add a value to an insertion-ordered dict-as-set unless it is already full"""
+        if len(bucket) < limit:
+            bucket.setdefault(value, None)
+    
+    # HPA XML element handlers - each records what it finds in the shared `found` collections
+    def _handle_hpa_subcellular_location(self, elem, found):
+        """Approach 1: subcellularLocation elements"""
+        # Try different ways to get location name
+        loc_name = None
+    
+        # Try as attribute
+        if elem.get('name'):
+            loc_name = elem.get('name')
+        # Try as text content
+        elif elem.text:
+            loc_name = elem.text.strip()
+        # Try nested elements
+        else:
+            for child in elem:
+                if child.text and child.text.strip():
+                    loc_name = child.text.strip()
+                    break
+    
+        if loc_name and self._is_valid_location_name(loc_name):
+            self._add_capped(found['locations'], loc_name.strip(), HPA_XML_MAX_LOCATIONS)
+            self.logger.debug(f"Found subcellular location: {loc_name}")
+    
+    def _handle_hpa_location(self, elem, found):
+        """Approach 2: location in different XML structures (including immunofluorescence data)"""
+        loc_name = self._extract_location_name(elem)
+        if loc_name and self._is_valid_location_name(loc_name):
+            self._add_capped(found['locations'], loc_name, HPA_XML_MAX_LOCATIONS)
+            self.logger.debug(f"Found location via {elem.tag}: {loc_name}")
+    
+    def _handle_hpa_immunofluorescence(self, elem, found):
+        """Approach 3: immunofluorescence location attribute"""
+        location_attr = elem.get('location', '')
+        if location_attr and self._is_valid_location_name(location_attr):
+            self._add_capped(found['locations'], location_attr, HPA_XML_MAX_LOCATIONS)
+            self.logger.debug(f"Found IF location: {location_attr}")
+    
+    def _handle_hpa_antibody(self, elem, found):
+        """Approach 4: antibody staining locations, plus antibody reliability"""
+        for staining in elem.iter('staining'):
+            location_attr = staining.get('location', '')
+            if location_attr and self._is_valid_location_name(location_attr):
+                self._add_capped(found['locations'], location_attr, HPA_XML_MAX_LOCATIONS)
+        
+            # Check for location in staining text
+            if staining.text:
+                parsed_locations = self._parse_location_from_text(staining.text)
+                for parsed_location in parsed_locations:
+                    self._add_capped(found['locations'], parsed_location, HPA_XML_MAX_LOCATIONS)
+    
+        reliability = elem.get('reliability', '')
+        if reliability:
+            found['antibody_info'].append(reliability)
+    
+    def _handle_hpa_go(self, elem, found):
+        """Approach 5: GO cellular component terms"""
+        go_term = elem.get('term', '')
+        go_aspect = elem.get('aspect', '')
+    
+        if go_aspect.lower() == 'cellular_component' and go_term:
+            # Clean up GO term
+            clean_term = go_term.replace('GO:', '').strip()
+            if self._is_valid_location_name(clean_term):
+                self._add_capped(found['locations'], clean_term, HPA_XML_MAX_LOCATIONS)
+                self.logger.debug(f"Found GO cellular component: {clean_term}")
+    
+    def _handle_hpa_tissue(self, elem, found):
+        """Tissue expression data"""
+        tissue_name = elem.get('name', elem.text)
+        level = elem.get('level', 'detected')
+    
+        if tissue_name and self._is_valid_tissue_name(tissue_name):
+            self._add_capped(found['tissues'], tissue_name.strip(), HPA_XML_MAX_TISSUES)
+            if level and level != 'not detected':
+                found['expression_levels'].append(f"{tissue_name.strip()}:{level}")
+    
+    def _handle_hpa_expression(self, elem, found):
+        """Expression data from different XML structures"""
+        tissue = elem.get('tissue', '')
+        level = elem.get('level', '')
+    
+        if tissue and self._is_valid_tissue_name(tissue):
+            self._add_capped(found['tissues'], tissue, HPA_XML_MAX_TISSUES)
+            if level != 'not detected':
+                found['expression_levels'].append(f"{tissue}:{level}")
         
     def _extract_location_name(self, element):
         """Extract location name from XML element"""
@@ -903,7 +1407,7 @@ class HumanProteinAnalyzerManager:
             
             if response.status_code == 200:
                 try:
-                    data = response.json()
+                    data = self._load_json(response)
                     
                     tissues = set()
                     expression_levels = []
@@ -947,33 +1451,18 @@ class HumanProteinAnalyzerManager:
         if not location_name or len(location_name) < 3:
             return False
     
-        location_lower = location_name.lower().strip()
-    
-        # Check for obvious corruption patterns
-        corruption_indicators = [
-            'javascript', 'function', 'document', 'window', 'var ',
-            'html', 'css', 'style', 'class=', 'id=', '{', '}',
-            'position:', 'width:', 'height:', 'px', 'em',
-            'humanproteome', 'proteinatlas'
-        ]
-    
-        if any(indicator in location_lower for indicator in corruption_indicators):
-            return False
-    
         # Check if it's too long (likely corrupted)
         if len(location_name) > 50:
             return False
     
-        # Check for reasonable cellular location terms
-        valid_location_keywords = [
-            'nucleus', 'cytoplasm', 'membrane', 'mitochondria', 'endoplasmic',
-            'golgi', 'ribosome', 'lysosome', 'peroxisome', 'secreted',
-            'extracellular', 'plasma', 'nuclear', 'cytoplasmic', 'vesicle',
-            'organelle', 'compartment', 'reticulum', 'apparatus'
-        ]
+        location_lower = location_name.lower().strip()
+    
+        # Check for obvious corruption patterns
+        if LOCATION_CORRUPTION_PATTERN.search(location_lower):
+            return False
     
         # If it contains any valid keywords, it's probably good
-        if any(keyword in location_lower for keyword in valid_location_keywords):
+        if VALID_LOCATION_PATTERN.search(location_lower):
             return True
     
         # If it's short and alphanumeric, it might be valid
@@ -995,7 +1484,7 @@ class HumanProteinAnalyzerManager:
             response = self.session.get(url, params=params, timeout=20)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self._load_json(response)
                 experiments = data.get('experiments', [])
                 
                 tissues = set()
@@ -1042,54 +1531,101 @@ class HumanProteinAnalyzerManager:
             self.logger.debug(f"GTEx query failed for {gene_name}: {e}")
             return None
     
+    def _get_uniprot_tissue_enhanced_batch(self, gene_names):
+        """Prefetch UniProt tissue annotations for many genes with one search per batch"""
+        unique_genes = [gene for gene in dict.fromkeys(gene_names) if gene and gene not in self.uniprot_batch_cache]
+        
+        for start in range(0, len(unique_genes), UNIPROT_BATCH_SIZE):
+            batch = unique_genes[start:start + UNIPROT_BATCH_SIZE]
+            try:
+                url = "https://rest.uniprot.org/uniprotkb/search"
+                params = {
+                    'query': f"({' OR '.join(f'gene:{gene}' for gene in batch)}) AND organism_id:9606",
+                    'format': 'json',
+                    'fields': 'accession,gene_names,cc_function,cc_tissue_specificity,cc_developmental_stage',
+                    'size': min(500, len(batch) * 3)
+                }
+                
+                response = self.session.get(url, params=params, timeout=15)
+                
+                if response.status_code != 200:
+                    self.logger.debug(f"UniProt tissue batch query failed: HTTP {response.status_code}")
+                    continue
+                
+                # Group entries by requested gene (primary name or synonym), keeping the top 3 per gene
+                wanted = {gene.upper(): gene for gene in batch}
+                grouped = {}
+                
+                for protein in self._load_json(response).get('results', []):
+                    for gene_entry in protein.get('genes', []):
+                        names = [gene_entry.get('geneName', {}).get('value', '')]
+                        names.extend(synonym.get('value', '') for synonym in gene_entry.get('synonyms', []))
+                        
+                        for name in names:
+                            gene = wanted.get(name.upper())
+                            if gene and len(grouped.setdefault(gene, [])) < 3 and protein not in grouped[gene]:
+                                grouped[gene].append(protein)
+                
+                # Genes without hits are left uncached so the single-gene query still runs for them
+                self.uniprot_batch_cache.update(grouped)
+                self.logger.info(f"UniProt tissue batch: {len(grouped)}/{len(batch)} genes prefetched")
+                
+            except Exception as e:
+                self.logger.debug(f"UniProt tissue batch query failed: {e}")
+    
     def _get_uniprot_tissue_enhanced(self, gene_name):
         """Enhanced UniProt tissue specificity extraction"""
         try:
-            url = "https://rest.uniprot.org/uniprotkb/search"
-            params = {
-                'query': f'gene:{gene_name} AND organism_id:9606',
-                'format': 'json',
-                'fields': 'accession,cc_function,cc_tissue_specificity,cc_developmental_stage',
-                'size': 3
-            }
-            
-            response = self.session.get(url, params=params, timeout=15)
+            # Use entries prefetched by the batch query when available
+            results = self.uniprot_batch_cache.get(gene_name)
             
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', [])
+            if results is None:
+                url = "https://rest.uniprot.org/uniprotkb/search"
+                params = {
+                    'query': f'gene:{gene_name} AND organism_id:9606',
+                    'format': 'json',
+                    'fields': 'accession,cc_function,cc_tissue_specificity,cc_developmental_stage',
+                    'size': 3
+                }
                 
-                tissues = set()
-                expression_levels = []
+                response = self.session.get(url, params=params, timeout=15)
                 
-                for protein in results:
-                    comments = protein.get('comments', [])
+                if response.status_code != 200:
+                    return None
+                
+                results = self._load_json(response).get('results', [])
+            
+            tissues = set()
+            expression_levels = []
+            
+            for protein in results:
+                comments = protein.get('comments', [])
+                
+                for comment in comments:
+                    comment_type = comment.get('commentType', '')
                     
-                    for comment in comments:
-                        comment_type = comment.get('commentType', '')
+                    if comment_type in ['TISSUE SPECIFICITY', 'FUNCTION', 'DEVELOPMENTAL STAGE']:
+                        texts = comment.get('texts', [])
                         
-                        if comment_type in ['TISSUE SPECIFICITY', 'FUNCTION', 'DEVELOPMENTAL STAGE']:
-                            texts = comment.get('texts', [])
+                        for text in texts:
+                            text_value = text.get('value', '')
                             
-                            for text in texts:
-                                text_value = text.get('value', '')
-                                
-                                # Extract tissue mentions from text
-                                tissue_matches = self._extract_tissues_from_text(text_value)
-                                
-                                for tissue in tissue_matches:
-                                    tissues.add(tissue.title())
-                                    expression_levels.append(f"{tissue.title()}:mentioned")
-                
-                if tissues:
-                    return {
-                        'gene_name': gene_name,
-                        'tissues': list(tissues)[:15],
-                        'subcellular_locations': [],
-                        'expression_levels': expression_levels[:15],
-                        'antibody_info': [],
-                        'source': 'UniProt_Tissue'
-                    }
+                            # Extract tissue mentions from text
+                            tissue_matches = self._extract_tissues_from_text(text_value)
+                            
+                            for tissue in tissue_matches:
+                                tissues.add(tissue.title())
+                                expression_levels.append(f"{tissue.title()}:mentioned")
+            
+            if tissues:
+                return {
+                    'gene_name': gene_name,
+                    'tissues': list(tissues)[:15],
+                    'subcellular_locations': [],
+                    'expression_levels': expression_levels[:15],
+                    'antibody_info': [],
+                    'source': 'UniProt_Tissue'
+                }
             
             return None
             
@@ -1104,64 +1640,15 @@ class HumanProteinAnalyzerManager:
         
         text_lower = text.lower()
         
-        # Comprehensive tissue keyword mapping
-        tissue_keywords = {
-            'brain': 'Brain',
-            'cerebral': 'Brain',
-            'neuronal': 'Brain',
-            'cortex': 'Brain cortex',
-            'hippocampus': 'Hippocampus',
-            'liver': 'Liver',
-            'hepatic': 'Liver',
-            'hepatocyte': 'Liver',
-            'kidney': 'Kidney',
-            'renal': 'Kidney',
-            'heart': 'Heart',
-            'cardiac': 'Heart',
-            'myocardium': 'Heart muscle',
-            'lung': 'Lung',
-            'pulmonary': 'Lung',
-            'muscle': 'Muscle',
-            'skeletal muscle': 'Skeletal muscle',
-            'smooth muscle': 'Smooth muscle',
-            'skin': 'Skin',
-            'dermal': 'Skin',
-            'epidermis': 'Skin',
-            'blood': 'Blood',
-            'plasma': 'Blood',
-            'serum': 'Blood',
-            'bone': 'Bone',
-            'skeletal': 'Bone',
-            'testis': 'Testis',
-            'ovary': 'Ovary',
-            'ovarian': 'Ovary',
-            'breast': 'Breast',
-            'mammary': 'Breast',
-            'prostate': 'Prostate',
-            'pancreas': 'Pancreas',
-            'pancreatic': 'Pancreas',
-            'thyroid': 'Thyroid',
-            'adrenal': 'Adrenal gland',
-            'spleen': 'Spleen',
-            'lymph': 'Lymphoid tissue',
-            'intestine': 'Intestine',
-            'colon': 'Colon',
-            'stomach': 'Stomach',
-            'gastric': 'Stomach',
-            'esophagus': 'Esophagus',
-            'trachea': 'Trachea',
-            'bladder': 'Bladder',
-            'uterus': 'Uterus',
-            'placenta': 'Placenta',
-            'eye': 'Eye',
-            'retina': 'Retina',
-            'cornea': 'Cornea'
-        }
+        # Single pass over the text when the Aho-Corasick automaton is available
+        if self.tissue_automaton is not None:
+            return list({tissue_name for _, tissue_name in self.tissue_automaton.iter(text_lower)})
         
+        # Otherwise scan per keyword, skipping synonyms of tissues already found
         found_tissues = set()
         
-        for keyword, tissue_name in tissue_keywords.items():
-            if keyword in text_lower:
+        for keyword, tissue_name in TISSUE_KEYWORDS.items():
+            if tissue_name not in found_tissues and keyword in text_lower:
                 found_tissues.add(tissue_name)
         
         return list(found_tissues)
@@ -1179,25 +1666,13 @@ class HumanProteinAnalyzerManager:
         if not (tissues or expression_levels or subcellular_locations):
             return False
         
-        # Check for corruption patterns
-        corruption_indicators = [
-            'humanproteome', 'position:', 'collision:', 'width:', 
-            'javascript', 'function', '{', '}', 'var ', 'document.',
-            'sub_section', 'appendelem', 'htmlelement', 'nodelist'
-        ]
-        
-        # Check all data fields for corruption
-        all_data = []
-        all_data.extend(tissues)
-        all_data.extend([str(item) for item in expression_levels])
-        all_data.extend(subcellular_locations)
-        
-        for item in all_data:
-            item_str = str(item).lower()
-            for indicator in corruption_indicators:
-                if indicator in item_str:
-                    self.logger.debug(f"HPA data corruption detected: {indicator} in {item_str[:50]}")
-                    return False
+        # Scan every field for corruption in one pass; the \x1f separator keeps matches from
+        # spanning two items
+        all_data = '\x1f'.join(map(str, chain(tissues, expression_levels, subcellular_locations))).lower()
+        match = HPA_CORRUPTION_PATTERN.search(all_data)
+        if match:
+            self.logger.debug(f"HPA data corruption detected: {match.group()} in {all_data[match.start():match.start() + 50]}")
+            return False
         
         return True
     
@@ -1206,29 +1681,23 @@ class HumanProteinAnalyzerManager:
         if not tissue_name or len(tissue_name) < 3:
             return False
     
-        tissue_lower = tissue_name.lower().strip()
-    
-        # Check for corruption
-        corruption_indicators = [
-            'javascript', 'function', 'document', 'humanproteome'
-        ]
-    
-        if any(indicator in tissue_lower for indicator in corruption_indicators):
-            return False
-    
         # Check length
         if len(tissue_name) > 50:
             return False
     
+        # Check for corruption
+        if TISSUE_CORRUPTION_PATTERN.search(tissue_name.lower()):
+            return False
+    
         return True
     
-    def _process_hpa_data_enhanced(self, results, idx, data, gene_name):
-        """Process HPA data with correct column names and better subcellular location handling"""
+    def _process_hpa_data_enhanced(self, data, gene_name):
+        """Process HPA data with correct column names and better subcellular location handling, returning column values"""
         if not data or not self._is_valid_hpa_data(data):
-            self._set_hpa_no_value(results, idx)
-            return
+            return HPA_NO_VALUE
     
         try:
+            row = {}
             tissues = data.get('tissues', [])
             subcellular_locations = data.get('subcellular_locations', [])  # This should now have data
             expression_levels = data.get('expression_levels', [])
@@ -1237,29 +1706,24 @@ class HumanProteinAnalyzerManager:
         
             # Process primary tissue (highest priority/most mentioned)
             if tissues:
-                # Count tissue mentions to find primary
-                tissue_counts = {}
-                for tissue in tissues:
-                    tissue_counts[tissue] = tissue_counts.get(tissue, 0) + 1
-            
                 # Get primary tissue (most mentioned, or first if tie)
-                primary_tissue = max(tissue_counts.keys(), key=lambda k: tissue_counts[k])
-                results.at[idx, 'hpa_primary_tissue'] = primary_tissue
+                primary_tissue, _ = Counter(tissues).most_common(1)[0]
+                row['hpa_primary_tissue'] = primary_tissue
             
-                # Determine expression level for primary tissue
-                primary_expression = "detected"
+                # Map each tissue to its first reported expression level
+                expression_map = {}
                 for expr in expression_levels:
-                    if primary_tissue.lower() in expr.lower():
-                        # Extract level from expression string
-                        if ':' in expr:
-                            level_part = expr.split(':', 1)[1]
-                            primary_expression = level_part.strip()
-                        break
-            
-                results.at[idx, 'hpa_expression_level'] = primary_expression
+                    if ':' in expr:
+                        tissue_part, level_part = expr.split(':', 1)
+                        expression_map.setdefault(tissue_part.strip().lower(), level_part.strip())
+            
+                # Determine expression level for primary tissue
+                primary_expression = expression_map.get(primary_tissue.lower(), "detected")
+            
+                row['hpa_expression_level'] = primary_expression
             else:
-                results.at[idx, 'hpa_primary_tissue'] = "NO VALUE FOUND"
-                results.at[idx, 'hpa_expression_level'] = "NO VALUE FOUND"
+                row['hpa_primary_tissue'] = "NO VALUE FOUND"
+                row['hpa_expression_level'] = "NO VALUE FOUND"
         
             # Process all tissue expression data
             if expression_levels:
@@ -1268,9 +1732,9 @@ class HumanProteinAnalyzerManager:
                 for expr in expression_levels[:20]:  # Limit to top 20
                     clean_expr = str(expr).replace(f" ({source})", "")  # Remove source tags
                     clean_expressions.append(clean_expr)
-                results.at[idx, 'hpa_all_tissues'] = " | ".join(clean_expressions)
+                row['hpa_all_tissues'] = " | ".join(clean_expressions)
             else:
-                results.at[idx, 'hpa_all_tissues'] = "NO VALUE FOUND"
+                row['hpa_all_tissues'] = "NO VALUE FOUND"
         
             # FIXED: Process subcellular locations with better handling
             if subcellular_locations:
@@ -1282,33 +1746,35 @@ class HumanProteinAnalyzerManager:
                         clean_locations.append(clean_loc)
             
                 if clean_locations:
-                    results.at[idx, 'hpa_subcellular_location'] = " | ".join(clean_locations)
+                    row['hpa_subcellular_location'] = " | ".join(clean_locations)
                     self.logger.info(f"HPA subcellular locations for {gene_name}: {clean_locations}")
                 else:
-                    results.at[idx, 'hpa_subcellular_location'] = "NO VALUE FOUND"
+                    row['hpa_subcellular_location'] = "NO VALUE FOUND"
                     self.logger.warning(f"HPA subcellular locations were found but failed validation for {gene_name}")
             else:
-                results.at[idx, 'hpa_subcellular_location'] = "NO VALUE FOUND"
+                row['hpa_subcellular_location'] = "NO VALUE FOUND"
                 self.logger.debug(f"No HPA subcellular locations found for {gene_name}")
         
             # Process antibody reliability as numerical score
             if antibody_info:
                 # Convert reliability info to numerical score (0-5)
                 reliability_score = self._calculate_reliability_score(antibody_info)
-                results.at[idx, 'hpa_antibody_reliability'] = reliability_score
+                row['hpa_antibody_reliability'] = reliability_score
             else:
-                results.at[idx, 'hpa_antibody_reliability'] = 3  # Default medium reliability
+                row['hpa_antibody_reliability'] = 3  # Default medium reliability
         
             # Store data source
-            results.at[idx, 'hpa_data_source'] = source
+            row['hpa_data_source'] = source
         
             # Log success with subcellular location info
             subcell_info = "with subcellular locations" if subcellular_locations else "no subcellular locations"
-            self.logger.info(f"HPA success for {gene_name}: Primary tissue={results.at[idx, 'hpa_primary_tissue']}, Total tissues={len(tissues)}, {subcell_info} ({source})")
+            self.logger.info(f"HPA success for {gene_name}: Primary tissue={row['hpa_primary_tissue']}, Total tissues={len(tissues)}, {subcell_info} ({source})")
+            
+            return row
         
         except Exception as e:
             self.logger.error(f"Error processing HPA data for {gene_name}: {e}")
-            self._set_hpa_no_value(results, idx)
+            return HPA_NO_VALUE
     
     def _calculate_reliability_score(self, antibody_info):
         """Convert antibody reliability information to numerical score (0-5)"""
@@ -1316,100 +1782,51 @@ class HumanProteinAnalyzerManager:
             if not antibody_info:
                 return 3  # Default medium
             
-            # Convert reliability terms to scores
+            # Convert reliability terms to scores - the best term mentioned wins
             reliability_text = " ".join(str(info).lower() for info in antibody_info)
             
-            if any(term in reliability_text for term in ['high', 'excellent', 'validated']):
-                return 5
-            elif any(term in reliability_text for term in ['good', 'reliable']):
-                return 4
-            elif any(term in reliability_text for term in ['medium', 'moderate']):
-                return 3
-            elif any(term in reliability_text for term in ['low', 'poor']):
-                return 2
-            elif any(term in reliability_text for term in ['unknown', 'uncertain']):
-                return 1
-            else:
-                return 3  # Default medium
+            return max(
+                (RELIABILITY_TERM_SCORES[term] for term in RELIABILITY_TERM_PATTERN.findall(reliability_text)),
+                default=3  # Default medium
+            )
         
         except Exception:
             return 3  # Default medium
     
-    def _set_compartments_no_value(self, results, idx):
-        """Set COMPARTMENTS fields to NO VALUE FOUND"""
-        compartments_fields = [
-            'compartments_primary_location', 'compartments_primary_confidence',
-            'compartments_all_locations', 'compartments_confidence_scores',
-            'compartments_evidence_types', 'compartments_data_sources'
-        ]
-        for field in compartments_fields:
-            if field == 'compartments_primary_confidence':
-                results.at[idx, field] = 0  # Numerical 0 for no confidence
-            else:
-                results.at[idx, field] = "NO VALUE FOUND"
-    
-    def _set_hpa_no_value(self, results, idx):
-        """Set HPA fields to NO VALUE FOUND"""
-        hpa_fields = [
-            'hpa_primary_tissue', 'hpa_expression_level', 'hpa_all_tissues',
-            'hpa_subcellular_location', 'hpa_antibody_reliability', 'hpa_data_source'
-        ]
-        for field in hpa_fields:
-            if field == 'hpa_antibody_reliability':
-                results.at[idx, field] = 0  # Numerical 0 for unknown reliability
-            else:
-                results.at[idx, field] = "NO VALUE FOUND"
-    
     def _log_analysis_statistics(self, results, options):
         """Log success statistics for debugging"""
         total = len(results)
         
         if options.get('compartments', False):
-            comp_success = sum(1 for _, row in results.iterrows() 
-                             if row.get('compartments_location', 'NO VALUE FOUND') != 'NO VALUE FOUND')
+            comp_success = int((results['compartments_primary_location'] != 'NO VALUE FOUND').sum())
             self.logger.info(f"Enhanced COMPARTMENTS final success rate: {comp_success}/{total} ({comp_success/total*100:.1f}%)")
         
         if options.get('hpa', False):
-            hpa_success = sum(1 for _, row in results.iterrows() 
-                            if row.get('hpa_tissue_expression', 'NO VALUE FOUND') != 'NO VALUE FOUND' and
-                               'Humanproteome' not in str(row.get('hpa_tissue_expression', '')))
+            primary_tissue = results['hpa_primary_tissue'].astype(str)
+            hpa_success = int(((primary_tissue != 'NO VALUE FOUND') &
+                               ~primary_tissue.str.contains('Humanproteome', regex=False)).sum())
             self.logger.info(f"HPA final success rate: {hpa_success}/{total} ({hpa_success/total*100:.1f}%)")
 
     def _parse_location_from_text(self, text):
         """Parse subcellular locations mentioned in text"""
         if not text:
-            return set()
+            return frozenset()
     
         text_lower = text.lower()
-        found_locations = set()
-    
-        # Common subcellular location terms
-        location_terms = {
-            'nucleus': 'Nucleus',
-            'nuclear': 'Nucleus',
-            'cytoplasm': 'Cytoplasm',
-            'cytoplasmic': 'Cytoplasm',
-            'mitochondria': 'Mitochondrion',
-            'mitochondrial': 'Mitochondrion',
-            'membrane': 'Membrane',
-            'plasma membrane': 'Plasma membrane',
-            'cell membrane': 'Cell membrane',
-            'endoplasmic reticulum': 'Endoplasmic reticulum',
-            'er': 'Endoplasmic reticulum',
-            'golgi': 'Golgi apparatus',
-            'ribosome': 'Ribosome',
-            'ribosomal': 'Ribosome',
-            'lysosome': 'Lysosome',
-            'lysosomal': 'Lysosome',
-            'peroxisome': 'Peroxisome',
-            'secreted': 'Secreted',
-            'extracellular': 'Extracellular'
-        }
-    
-        for term, standard_name in location_terms.items():
-            if term in text_lower:
-                found_locations.add(standard_name)
-    
+        
+        found_locations = self.location_text_cache.get(text_lower)
+        if found_locations is not None:
+            return found_locations
+        
+        # Single pass over the text when the Aho-Corasick automaton is available
+        if self.location_automaton is not None:
+            found_locations = frozenset(standard_name for _, standard_name in self.location_automaton.iter(text_lower))
+        else:
+            found_locations = frozenset(
+                standard_name for term, standard_name in SUBCELLULAR_LOCATION_TERMS.items() if term in text_lower
+            )
+        
+        self.location_text_cache[text_lower] = found_locations
         return found_locations
 
 class EnsemblGeneMapper:
@@ -1417,76 +1834,232 @@ class EnsemblGeneMapper:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.cache = {}
+        self.cache_entries = self._load_cache()
+        self.cache = {symbol: ensembl_id for symbol, (ensembl_id, timestamp) in self.cache_entries.items()}
+        
+        # Symbols left unmatched only because a request failed - not saved as misses
+        self.unresolved = set()
+        self._request_lock = threading.Lock()
+        self._next_request_time = 0.0
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'ProtMerge/1.2.0',
             'Accept': 'application/json'
         })
+        
+        # Keep connections alive for the concurrent fallback lookups; the symbol lookups are
+        # idempotent, so POSTs are retried too, and 429s honour the server's Retry-After
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=('GET', 'POST')
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def _load_cache(self):
+        """Load symbol mappings saved by earlier runs, dropping expired entries"""
+        now = time.time()
+        try:
+            with open(ENSEMBL_CACHE['path'], 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return {
+                symbol: (ensembl_id, timestamp) for symbol, (ensembl_id, timestamp) in entries.items()
+                if now - timestamp < ENSEMBL_CACHE['expire_after' if ensembl_id else 'missing_expire_after']
+            }
+        except (OSError, ValueError, AttributeError, TypeError):
+            # Missing, unreadable or not shaped like {symbol: [ensembl_id, timestamp]} - start afresh
+            return {}
+    
+    def save_cache(self):
+        """Persist symbol mappings resolved this run"""
+        new_entries = {
+            symbol: ensembl_id for symbol, ensembl_id in self.cache.items()
+            if symbol not in self.cache_entries and symbol not in self.unresolved
+        }
+        
+        # If nothing resolved this run the misses are more likely network failures than unknown symbols
+        if not any(new_entries.values()):
+            return
+        
+        now = time.time()
+        self.cache_entries.update((symbol, (ensembl_id, now)) for symbol, ensembl_id in new_entries.items())
+        
+        try:
+            with open(ENSEMBL_CACHE['path'], 'w', encoding='utf-8') as f:
+                json.dump(self.cache_entries, f)
+        except OSError as e:
+            self.logger.debug(f"Could not save Ensembl symbol cache: {e}")
     
     def get_ensembl_id(self, gene_symbol):
         """Get Ensembl gene ID with enhanced gene symbol matching"""
         if gene_symbol in self.cache:
             return self.cache[gene_symbol]
         
+        return self.get_ensembl_ids([gene_symbol]).get(str(gene_symbol).strip())
+    
+    def get_ensembl_ids(self, gene_symbols):
+        """Resolve many gene symbols at once via batched MyGene.info queries, then batched Ensembl lookups"""
+        symbols = [symbol for symbol in dict.fromkeys(str(gene_symbol).strip() for gene_symbol in gene_symbols) if symbol]
+        pending = [symbol for symbol in symbols if symbol not in self.cache]
+        
+        # MyGene.info answers batched symbol queries far faster than Ensembl REST, so ask it first
+        # and leave only what it could not match to the Ensembl lookups below
+        failed = set()
+        for start in range(0, len(pending), MYGENE_BATCH_SIZE):
+            batch = pending[start:start + MYGENE_BATCH_SIZE]
+            found = self._try_mygene_batch(batch)
+            if found is None:
+                failed.update(batch)
+                continue
+            self.cache.update((symbol, ensembl_id) for symbol, ensembl_id in found.items() if ensembl_id)
+        pending = [symbol for symbol in pending if symbol not in self.cache]
+        
+        if pending:
+            candidates = {symbol: self._symbol_strategies(symbol) for symbol in pending}
+            spellings = list(dict.fromkeys(chain.from_iterable(candidates.values())))
+            found = {}
+            
+            for start in range(0, len(spellings), ENSEMBL_BATCH_SIZE):
+                batch = spellings[start:start + ENSEMBL_BATCH_SIZE]
+                batch_found = self._try_ensembl_batch(batch)
+                
+                # Fall back to one lookup per spelling if the batch request itself failed
+                if batch_found is None:
+                    with ThreadPoolExecutor(ENSEMBL_MAX_WORKERS) as executor:
+                        batch_found = dict(zip(batch, executor.map(self._try_ensembl_direct, batch)))
+                    failed.update(spelling for spelling, ensembl_id in batch_found.items() if ensembl_id is False)
+                found.update(batch_found)
+            
+            for symbol, strategies in candidates.items():
+                # First strategy that resolved wins, as in the one-at-a-time lookup order
+                ensembl_id = next((found[strategy] for strategy in strategies if found.get(strategy)), None)
+                
+                # Try alternative search using gene aliases
+                if not ensembl_id:
+                    ensembl_id = self._try_ensembl_search(symbol)
+                
+                # Misses are cached too, to avoid repeated lookups; only those every request
+                # answered are definite enough to save for later runs
+                self.cache[symbol] = ensembl_id
+                if not ensembl_id and (symbol in failed or failed.intersection(strategies)):
+                    self.unresolved.add(symbol)
+        
+        return {symbol: self.cache[symbol] for symbol in symbols}
+    
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _symbol_strategies(gene_symbol):
+        """Candidate spellings of a gene symbol, in lookup priority order"""
+        strategies = [
+            gene_symbol,           # Exact match
+            gene_symbol.upper(),   # Uppercase
+            gene_symbol.lower(),   # Lowercase
+        ]
+        
+        # Try with and without common suffixes/prefixes
+        if gene_symbol.endswith(('1', 'A', 'B')):
+            strategies.append(gene_symbol[:-1])
+        
+        return tuple(dict.fromkeys(strategies))
+    
+    def _try_mygene_batch(self, gene_symbols):
+        """Batched MyGene.info symbol query - returns {symbol: Ensembl ID or None}, or None if the request failed"""
         try:
-            gene_symbol = str(gene_symbol).strip()
-            if not gene_symbol:
+            url = "https://mygene.info/v3/query"
+            data = {
+                'q': ','.join(gene_symbols),
+                'scopes': 'symbol,alias',
+                'fields': 'ensembl.gene',
+                'species': 'human'
+            }
+            
+            response = self.session.post(url, data=data, timeout=30)
+            
+            if response.status_code != 200:
+                self.logger.debug(f"MyGene.info batch query failed: HTTP {response.status_code}")
                 return None
             
-            # Try multiple strategies
-            strategies = [
-                gene_symbol,           # Exact match
-                gene_symbol.upper(),   # Uppercase
-                gene_symbol.lower(),   # Lowercase
-            ]
+            # Hits come back best-scoring first, possibly several per query; keep the first Ensembl gene
+            found = {}
+            for hit in response.json():
+                gene_symbol = hit.get('query')
+                if found.get(gene_symbol) or hit.get('notfound'):
+                    continue
+                
+                ensembl = hit.get('ensembl') or []
+                if isinstance(ensembl, dict):
+                    ensembl = [ensembl]
+                
+                gene_ids = [entry.get('gene') for entry in ensembl]
+                found[gene_symbol] = next((gene_id for gene_id in gene_ids if gene_id and gene_id.startswith('ENSG')), None)
             
-            # Add common gene symbol variations
-            if gene_symbol.upper() != gene_symbol:
-                strategies.append(gene_symbol.upper())
+            return found
             
-            # Try with and without common suffixes/prefixes
-            if gene_symbol.endswith(('1', 'A', 'B')):
-                strategies.append(gene_symbol[:-1])
+        except Exception as e:
+            self.logger.debug(f"MyGene.info batch query failed: {e}")
+            return None
+    
+    def _try_ensembl_batch(self, gene_symbols):
+        """Batched Ensembl REST lookup - returns {symbol: Ensembl ID or None}, or None if the request failed"""
+        try:
+            url = "https://rest.ensembl.org/lookup/symbol/homo_sapiens"
             
-            for strategy in strategies:
-                ensembl_id = self._try_ensembl_direct(strategy)
-                if ensembl_id:
-                    self.cache[gene_symbol] = ensembl_id
-                    return ensembl_id
+            self._wait_for_request_slot()
+            response = self.session.post(url, json={'symbols': gene_symbols}, timeout=60)
             
-            # Try alternative search using gene aliases
-            ensembl_id = self._try_ensembl_search(gene_symbol)
-            if ensembl_id:
-                self.cache[gene_symbol] = ensembl_id
-                return ensembl_id
+            if response.status_code != 200:
+                self.logger.debug(f"Ensembl batch lookup failed: HTTP {response.status_code}")
+                return None
             
-            # Cache failures to avoid repeated lookups
-            self.cache[gene_symbol] = None
-            return None
+            data = response.json()
+            found = {}
+            for gene_symbol in gene_symbols:
+                ensembl_id = (data.get(gene_symbol) or {}).get('id')
+                found[gene_symbol] = ensembl_id if ensembl_id and ensembl_id.startswith('ENSG') else None
+            
+            return found
             
         except Exception as e:
-            self.logger.debug(f"Enhanced Ensembl lookup failed for {gene_symbol}: {e}")
-            self.cache[gene_symbol] = None
+            self.logger.debug(f"Ensembl batch lookup failed: {e}")
             return None
     
+    def _wait_for_request_slot(self):
+        """Block until this thread may send an Ensembl request under ENSEMBL_MAX_REQUESTS_PER_SECOND"""
+        with self._request_lock:
+            now = time.monotonic()
+            wait = self._next_request_time - now
+            self._next_request_time = max(now, self._next_request_time) + 1.0 / ENSEMBL_MAX_REQUESTS_PER_SECOND
+        
+        if wait > 0:
+            time.sleep(wait)
+    
     def _try_ensembl_direct(self, gene_symbol):
-        """Direct Ensembl REST API lookup"""
+        """Direct Ensembl REST API lookup - returns the Ensembl ID, None if not found, or False if the request failed"""
         try:
             url = f"https://rest.ensembl.org/lookup/symbol/homo_sapiens/{gene_symbol}"
             
+            self._wait_for_request_slot()
             response = self.session.get(url, timeout=10)
             
-            if response.status_code == 200:
-                data = response.json()
-                ensembl_id = data.get('id')
-                if ensembl_id and ensembl_id.startswith('ENSG'):
-                    return ensembl_id
+            # Ensembl answers unknown symbols with 400 (or 404)
+            if response.status_code in (400, 404):
+                return None
+            if response.status_code != 200:
+                self.logger.debug(f"Ensembl lookup failed for {gene_symbol}: HTTP {response.status_code}")
+                return False
             
-            return None
+            ensembl_id = response.json().get('id')
+            return ensembl_id if ensembl_id and ensembl_id.startswith('ENSG') else None
             
-        except Exception:
-            return None
+        except Exception as e:
+            self.logger.debug(f"Ensembl lookup failed for {gene_symbol}: {e}")
+            return False
     
     def _try_ensembl_search(self, gene_symbol):
         """Try Ensembl search API for gene aliases"""
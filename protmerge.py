@@ -6,129 +6,350 @@ Created by Matthew Hale
 """
 
 import sys
+import importlib.util
+import hashlib
+import json
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
+import re
 import time
 from pathlib import Path
-from gui_main import ProtMergeGUI
-from data_handler import DataHandler
-from analyzers import AnalyzerManager
-from excel_formatter import ExcelFormatter
+from config import RUN_CACHE
+
+# Analyses ProtMerge reports on, in display order:
+# (option key, summary key prefix, column checked for completeness, must be > 0, display name, input it needs)
+ANALYSIS_SPEC = (
+    ('compartments', 'compartments', 'compartments_primary_location', False, 'COMPARTMENTS', 'gene'),
+    ('hpa', 'hpa', 'hpa_primary_tissue', False, 'Human Protein Atlas', 'gene'),
+    ('uniprot', 'uniprot', 'function', False, 'UniProt', 'uniprot'),                 # Function data (core UniProt field)
+    ('protparam', 'protparam', 'mw', False, 'ProtParam', 'uniprot'),                 # Molecular weight; sequence from UniProt
+    ('blast', 'blast', 'identity', False, 'BLAST', 'uniprot'),                       # Identity data; sequence from UniProt
+    ('pdb_search', 'pdb', 'structure_count', True, 'PDB Structures', 'uniprot')      # Structure count (should be > 0)
+)
+
+# Cell values (upper-cased) that mean an analysis produced no data
+NO_VALUE_MARKERS = frozenset({'', 'NO VALUE FOUND', 'NAN', 'NONE', 'N/A'})
+
+# Names of the sheets ProtMerge adds to the output workbook
+RESULT_SHEET_PATTERN = re.compile('ProtMerge|Amino|PDB|Human|Similarity')
+
+# Log files kept in logs/ (oldest are removed at startup) and size at which a run's log rotates
+LOG_FILES_KEPT = 20
+LOG_MAX_BYTES = 5_000_000
+LOG_BACKUP_COUNT = 3
+
+# Read size used when hashing input workbooks for the run cache
+HASH_CHUNK_SIZE = 1 << 20
+
+# Minimum seconds between forwarded progress updates (~30 per second)
+PROGRESS_MIN_INTERVAL = 0.033
+
+# Options that change how a run is carried out but not its results, so they are left out of the run cache key
+RUN_CACHE_IGNORED_OPTIONS = ('use_cache',)
+
+# Loggers of the analysis pipeline whose errors keep a run out of the run cache
+PIPELINE_LOGGERS = ('data_handler', 'analyzers', 'human_protein_analyzer', 'similarity_analyzer',
+                    'similarity_dependencies', 'excel_formatter')
+
+
+class _ErrorCounter(logging.Handler):
+    """Counts the errors logged while attached"""
+    
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+    
+    def emit(self, record):
+        self.count += 1
 
 class ProtMerge:
     """Main ProtMerge application class"""
     
     def __init__(self):
-        self.data_handler = DataHandler()
-        self.analyzer_manager = AnalyzerManager()
-        self.excel_formatter = ExcelFormatter()
+        # Components pull in pandas, openpyxl, lxml and requests, so they are imported and created on first use
+        self._data_handler = None
+        self._analyzer_manager = None
+        self._excel_formatter = None
+        self._components_lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
         self.analysis_summary = None
         self.logger.info("ProtMerge v1.2.0 initialized")
+    
+    @property
+    def data_handler(self):
+        """Excel input loader, created on first use"""
+        with self._components_lock:
+            if self._data_handler is None:
+                from data_handler import DataHandler
+                self._data_handler = DataHandler()
+        return self._data_handler
+    
+    @property
+    def analyzer_manager(self):
+        """Analysis pipeline, created on first use"""
+        with self._components_lock:
+            if self._analyzer_manager is None:
+                from analyzers import AnalyzerManager
+                self._analyzer_manager = AnalyzerManager()
+        return self._analyzer_manager
+    
+    @property
+    def excel_formatter(self):
+        """Excel output writer, created on first use"""
+        with self._components_lock:
+            if self._excel_formatter is None:
+                from excel_formatter import ExcelFormatter
+                self._excel_formatter = ExcelFormatter()
+        return self._excel_formatter
         
     def run_gui(self):
         """Launch the GUI interface"""
+        # Create the analysis components in the background while the window is built
+        threading.Thread(target=self._warm_up_components, daemon=True).start()
+        
+        from gui_main import ProtMergeGUI
         gui = ProtMergeGUI(self)
         gui.run()
     
-    def run_analysis(self, input_file, sheet_name, column_index, options, progress_callback=None):
-        """Run complete analysis pipeline with flexible dependency handling"""
+    def _warm_up_components(self):
+        """Import and create the analysis components ahead of the first run"""
         try:
-            self.logger.info(f"Starting analysis for {Path(input_file).name}")
+            for component in ('data_handler', 'analyzer_manager', 'excel_formatter'):
+                getattr(self, component)
+        except Exception as e:
+            # Left for run_analysis to retry and report
+            self.logger.warning(f"Component preload failed: {e}")
     
-            # Load data
+    def run_analysis(self, input_file, sheet_name, column_index, options, progress_callback=None,
+                     read_excel_kwargs=None):
+        """Run complete analysis pipeline with flexible dependency handling"""
+        try:
+            input_name = Path(input_file).name
             if progress_callback:
-                progress_callback(0, "Loading data", f"Reading {Path(input_file).name}")
-    
-            data = self.data_handler.load_excel_data(
-                input_file, sheet_name, column_index, options.get('safe_mode', True)
-            )
-    
-            protein_count = len(data['results'])
-            self.logger.info(f"Loaded {protein_count} proteins for analysis")
+                progress_callback = self._make_throttled(progress_callback)
+            self.logger.info(f"Starting analysis for {input_name}")
             
-            # Determine input type and required analyses
-            using_gene_ids = options.get('use_gene_ids', False)
-            needs_uniprot_conversion = self._needs_uniprot_conversion(options, using_gene_ids)
-            
-            self.logger.info(f"Input type: {'Gene IDs' if using_gene_ids else 'UniProt IDs'}")
-            self.logger.info(f"UniProt conversion needed: {needs_uniprot_conversion}")
-            
-            # Phase 1: Human-specific analysis (for gene IDs only)
-            if using_gene_ids and self._has_human_analyses(options):
+            # Identical input and options reuse the workbook saved by an earlier run, unless turned off
+            cache_key = self._run_cache_key(input_file, sheet_name, column_index, options, read_excel_kwargs)
+            cached_run = self._get_cached_run(cache_key) if options.get('use_cache', True) else None
+            if cached_run:
+                self.logger.info(f"Reusing results from an identical earlier run: {cached_run['output_file']}")
+                self.analysis_summary = cached_run['summary']
                 if progress_callback:
-                    progress_callback(5, "Running human protein analysis", "Analyzing human-specific databases")
-                
-                self.logger.info("Running human-specific analysis before any conversion...")
-                data = self.analyzer_manager.run_human_protein_analysis(data, options, progress_callback)
-                
-                # Log human analysis results
-                self._log_human_analysis_results(data['results'], options, protein_count)
+                    progress_callback(100, "Analysis complete", "Reused results from an identical earlier run")
+                return Path(cached_run['output_file'])
             
-            # Phase 2: Gene to UniProt conversion (only if needed for downstream analyses)
-            if using_gene_ids and needs_uniprot_conversion:
-                start_progress = 25 if self._has_human_analyses(options) else 5
-                if progress_callback:
-                    progress_callback(start_progress, "Converting Gene IDs", "Converting gene names to UniProt IDs for downstream analyses")
+            # Errors logged by the analyzers (failed requests, parse errors) keep the run out of the cache
+            error_counter = _ErrorCounter()
+            for name in PIPELINE_LOGGERS:
+                logging.getLogger(name).addHandler(error_counter)
+            try:
+                output_file = self._run_pipeline(input_file, input_name, sheet_name, column_index, options,
+                                                 progress_callback, read_excel_kwargs)
+            finally:
+                for name in PIPELINE_LOGGERS:
+                    logging.getLogger(name).removeHandler(error_counter)
+            
+            if error_counter.count:
+                self.logger.info(f"Not caching this run: {error_counter.count} errors were logged during analysis")
+            else:
+                self._save_cached_run(cache_key, output_file, options)
+    
+            if progress_callback:
+                progress_callback(100, "Analysis complete", "Results saved successfully")
+    
+            return output_file
+    
+        except Exception as e:
+            self.logger.error(f"Analysis pipeline failed: {e}")
+            raise
+    
+    def _run_pipeline(self, input_file, input_name, sheet_name, column_index, options, progress_callback,
+                      read_excel_kwargs):
+        """Load, analyze and save one input - run_analysis without the run cache"""
+        # Load data
+        if progress_callback:
+            progress_callback(0, "Loading data", f"Reading {input_name}")
+        
+        data = self.data_handler.load_excel_data(
+            input_file, sheet_name, column_index, options.get('safe_mode', True), read_excel_kwargs
+        )
+    
+        protein_count = len(data['results'])
+        self.logger.info(f"Loaded {protein_count} proteins for analysis")
         
-                self.logger.info("Converting gene IDs to UniProt IDs for UniProt-dependent analyses...")
-                data = self.analyzer_manager.run_gene_conversion(data, progress_callback)
+        # Determine input type and required analyses
+        using_gene_ids = options.get('use_gene_ids', False)
+        needs_uniprot_conversion = self._needs_uniprot_conversion(options, using_gene_ids)
         
-                # Count successful conversions
-                converted_count = sum(1 for _, row in data['results'].iterrows() 
-                                    if row.get('Original_Gene_ID', '') and 
-                                        row.get('UniProt_ID', '') != row.get('Original_Gene_ID', ''))
+        self.logger.info(f"Input type: {'Gene IDs' if using_gene_ids else 'UniProt IDs'}")
+        self.logger.info(f"UniProt conversion needed: {needs_uniprot_conversion}")
         
-                self.logger.info(f"Gene conversion: {converted_count}/{protein_count} successful")
+        # Phase 1: Human-specific analysis (for gene IDs only)
+        if using_gene_ids and self._has_human_analyses(options):
+            if progress_callback:
+                progress_callback(5, "Running human protein analysis", "Analyzing human-specific databases")
             
-            # Phase 3: UniProt-dependent analyses (only if requested and conversion successful/not needed)
-            uniprot_analyses_requested = self._has_uniprot_dependent_analyses(options)
+            self.logger.info("Running human-specific analysis before any conversion...")
+            data = self.analyzer_manager.run_human_protein_analysis(data, options, progress_callback)
             
-            if uniprot_analyses_requested:
-                # Check if we have UniProt IDs to work with
-                has_uniprot_ids = self._has_valid_uniprot_ids(data['results'], using_gene_ids)
-                
-                if has_uniprot_ids:
-                    # Calculate starting progress
-                    if using_gene_ids and needs_uniprot_conversion:
-                        start_progress = 45 if self._has_human_analyses(options) else 25
-                    elif using_gene_ids:
-                        start_progress = 25 if self._has_human_analyses(options) else 5
-                    else:
-                        start_progress = 5
-                
-                    if progress_callback:
-                        progress_callback(start_progress, "Running UniProt-dependent analyses", "Starting protein data collection")
+            # Log human analysis results
+            self._log_human_analysis_results(data['results'], options, protein_count)
+        
+        # Phase 2: Gene to UniProt conversion (only if needed for downstream analyses)
+        if using_gene_ids and needs_uniprot_conversion:
+            start_progress = 25 if self._has_human_analyses(options) else 5
+            if progress_callback:
+                progress_callback(start_progress, "Converting Gene IDs", "Converting gene names to UniProt IDs for downstream analyses")
+    
+            self.logger.info("Converting gene IDs to UniProt IDs for UniProt-dependent analyses...")
+            data = self.analyzer_manager.run_gene_conversion(data, progress_callback)
+    
+            # Count successful conversions
+            converted_count = 0
+            if 'Original_Gene_ID' in data['results']:
+                original_ids = data['results']['Original_Gene_ID']
+                converted_count = int((original_ids.astype(bool) &
+                                       (data['results'].get('UniProt_ID', '') != original_ids)).sum())
+    
+            self.logger.info(f"Gene conversion: {converted_count}/{protein_count} successful")
+        
+        # Phase 3: UniProt-dependent analyses (only if requested and conversion successful/not needed)
+        uniprot_analyses_requested = self._has_uniprot_dependent_analyses(options)
+        
+        if uniprot_analyses_requested:
+            # Check if we have UniProt IDs to work with
+            has_uniprot_ids = self._has_valid_uniprot_ids(data['results'], using_gene_ids)
             
-                    results = self.analyzer_manager.run_uniprot_analyses(data, options, progress_callback)
+            if has_uniprot_ids:
+                # Calculate starting progress
+                if using_gene_ids and needs_uniprot_conversion:
+                    start_progress = 45 if self._has_human_analyses(options) else 25
+                elif using_gene_ids:
+                    start_progress = 25 if self._has_human_analyses(options) else 5
                 else:
-                    self.logger.warning("No valid UniProt IDs available for UniProt-dependent analyses")
-                    results = data['results']
-                    # Still initialize columns for consistency
-                    self.analyzer_manager._initialize_uniprot_columns(results, options)
+                    start_progress = 5
+            
+                if progress_callback:
+                    progress_callback(start_progress, "Running UniProt-dependent analyses", "Starting protein data collection")
+        
+                results = self.analyzer_manager.run_uniprot_analyses(data, options, progress_callback)
             else:
-                self.logger.info("No UniProt-dependent analyses requested")
+                self.logger.warning("No valid UniProt IDs available for UniProt-dependent analyses")
                 results = data['results']
+                # Still initialize columns for consistency
+                self.analyzer_manager._initialize_uniprot_columns(results, options)
+        else:
+            self.logger.info("No UniProt-dependent analyses requested")
+            results = data['results']
     
-            # Calculate analysis summary
-            self.analysis_summary = self._calculate_analysis_summary(results, options)
+        # Calculate analysis summary
+        self.analysis_summary = self._calculate_analysis_summary(results, options)
     
-            # Save results
-            if progress_callback:
-                progress_callback(98, "Saving results", "Creating Excel file")
+        # Save results
+        if progress_callback:
+            progress_callback(98, "Saving results", "Creating Excel file")
     
-            output_file = self.excel_formatter.save_results(input_file, results, options)
+        output_file = self.excel_formatter.save_results(input_file, results, options)
     
-            # Log completion summary
-            self._log_completion_summary(output_file, results, options)
+        # Log completion summary
+        self._log_completion_summary(output_file, results, options)
+        
+        return output_file
     
-            if progress_callback:
-                progress_callback(100, "Analysis complete", "Results saved successfully")
+    def _make_throttled(self, callback, min_interval=PROGRESS_MIN_INTERVAL):
+        """Wrap a progress callback so updates within a stage are forwarded at most every min_interval seconds"""
+        last_update = {'time': float('-inf'), 'stage': None}
+        
+        def throttled(pct, main_text, detail_text=""):
+            now = time.monotonic()
+            # Per-item labels look like "UniProt (3/250)", so the stage is the text before the counter
+            stage = main_text.split(' (', 1)[0]
+            # Stage changes and the final update always go through
+            if pct >= 100 or stage != last_update['stage'] or now - last_update['time'] >= min_interval:
+                last_update['time'] = now
+                last_update['stage'] = stage
+                callback(pct, main_text, detail_text)
+        
+        return throttled
     
-            return output_file
+    def _run_cache_key(self, input_file, sheet_name, column_index, options, read_excel_kwargs=None):
+        """Key identifying an analysis run by input file contents and settings, or None if it can't be keyed"""
+        options = {key: value for key, value in options.items() if key not in RUN_CACHE_IGNORED_OPTIONS}
+        if not all(value is None or isinstance(value, (bool, int, float, str)) for value in options.values()):
+            return None
+        
+        # Hash the workbook in 1 MiB chunks so large inputs are never held in memory whole
+        try:
+            file_hash = hashlib.blake2b()
+            with open(input_file, 'rb', buffering=HASH_CHUNK_SIZE) as f:
+                while chunk := f.read(HASH_CHUNK_SIZE):
+                    file_hash.update(chunk)
+        except OSError:
+            return None
+        
+        # Extra read_excel arguments change what is loaded, so they are part of the key; ones that
+        # don't serialize (converters, callables) can't be keyed and the run is not cached
+        try:
+            settings = json.dumps([file_hash.hexdigest(), sheet_name, column_index, options, read_excel_kwargs or {}],
+                                  sort_keys=True)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.blake2b(settings.encode('utf-8')).hexdigest()
+    
+    def _load_run_cache(self):
+        """Load earlier runs from the run cache, dropping expired entries"""
+        cutoff = time.time() - RUN_CACHE['expire_after']
+        try:
+            with open(RUN_CACHE['path'], 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return {key: entry for key, entry in entries.items() if entry.get('timestamp', 0) >= cutoff}
+        except (OSError, ValueError, AttributeError, TypeError):
+            # Missing, unreadable or not shaped like {key: run entry} - start afresh
+            return {}
+    
+    def _get_cached_run(self, cache_key):
+        """Return the cached run for a key if its output workbook is still unchanged on disk"""
+        if cache_key is None:
+            return None
+        
+        entry = self._load_run_cache().get(cache_key)
+        if not entry:
+            return None
+        
+        try:
+            if Path(entry['output_file']).stat().st_mtime != entry['output_mtime']:
+                return None
+        except (OSError, KeyError):
+            return None
+        
+        return entry
     
-        except Exception as e:
-            self.logger.error(f"Analysis pipeline failed: {e}")
-            raise
+    def _save_cached_run(self, cache_key, output_file, options):
+        """Record a finished run so an identical one can reuse its output"""
+        if cache_key is None or not output_file or not self.analysis_summary:
+            return
+        
+        # Runs where a requested analysis found nothing are more likely network failures, so rerun them
+        if any(options.get(spec[0], False) and not self.analysis_summary.get(f'{spec[1]}_complete')
+               for spec in ANALYSIS_SPEC):
+            return
+        
+        try:
+            entries = self._load_run_cache()
+            entries[cache_key] = {
+                'output_file': str(output_file),
+                'output_mtime': Path(output_file).stat().st_mtime,
+                'summary': self.analysis_summary,
+                'timestamp': time.time()
+            }
+            with open(RUN_CACHE['path'], 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+        except (OSError, TypeError) as e:
+            self.logger.warning(f"Could not save run cache: {e}")
     
     def _needs_uniprot_conversion(self, options, using_gene_ids):
         """Determine if UniProt conversion is needed based on requested analyses"""
@@ -140,47 +361,36 @@ class ProtMerge:
     
     def _has_uniprot_dependent_analyses(self, options):
         """Check if any UniProt-dependent analyses are requested"""
-        uniprot_dependent = [
-            'uniprot',      # UniProt data itself
-            'protparam',    # Needs sequence from UniProt
-            'blast',        # Needs sequence from UniProt
-            'pdb_search'    # Needs UniProt ID for PDB search
-        ]
-        
-        return any(options.get(analysis, False) for analysis in uniprot_dependent)
+        return any(options.get(spec[0], False) for spec in ANALYSIS_SPEC if spec[5] == 'uniprot')
     
     def _has_human_analyses(self, options):
         """Check if human-specific analyses are requested"""
-        return options.get('compartments', False) or options.get('hpa', False)
+        return any(options.get(spec[0], False) for spec in ANALYSIS_SPEC if spec[5] == 'gene')
     
     def _has_valid_uniprot_ids(self, results, using_gene_ids):
         """Check if we have valid UniProt IDs to work with"""
+        if 'UniProt_ID' not in results:
+            return False
+        
+        uniprot_ids = results['UniProt_ID']
+        valid = uniprot_ids.astype(bool) & ~uniprot_ids.isin(['', 'NO VALUE FOUND'])
+        
         if using_gene_ids:
             # Check if conversion was successful for at least some entries
-            valid_count = sum(1 for _, row in results.iterrows() 
-                            if row.get('UniProt_ID', '') and 
-                               row.get('UniProt_ID', '') != row.get('Original_Gene_ID', '') and
-                               row.get('UniProt_ID', '') not in ['', 'NO VALUE FOUND'])
-            return valid_count > 0
-        else:
-            # Already using UniProt IDs
-            valid_count = sum(1 for _, row in results.iterrows() 
-                            if row.get('UniProt_ID', '') and 
-                               row.get('UniProt_ID', '') not in ['', 'NO VALUE FOUND'])
-            return valid_count > 0
+            valid &= uniprot_ids != results.get('Original_Gene_ID', '')
+        
+        return bool(valid.any())
     
     def _log_human_analysis_results(self, results, options, protein_count):
         """Log human analysis results - Fixed to use correct column names"""
         if options.get('compartments', False):
             # Use the correct column name from human_protein_analyzer.py
-            compartments_complete = sum(1 for _, row in results.iterrows() 
-                                    if self._is_data_complete(row.get('compartments_primary_location', '')))
+            compartments_complete = self._count_complete(results, 'compartments_primary_location')
             self.logger.info(f"COMPARTMENTS analysis: {compartments_complete}/{protein_count} successful")
     
         if options.get('hpa', False):
             # Use the correct column name from human_protein_analyzer.py
-            hpa_complete = sum(1 for _, row in results.iterrows() 
-                            if self._is_data_complete(row.get('hpa_primary_tissue', '')))
+            hpa_complete = self._count_complete(results, 'hpa_primary_tissue')
             self.logger.info(f"HPA analysis: {hpa_complete}/{protein_count} successful")
     
     def get_analysis_summary(self):
@@ -189,115 +399,71 @@ class ProtMerge:
     
     def _calculate_analysis_summary(self, results, options):
         """Calculate analysis summary statistics - Fixed to use correct column names"""
+        import pandas as pd
+        
         try:
             total_proteins = len(results)
+            
+            # Nothing to count when there are no rows or no analysis with a completeness column was requested
+            requested = [spec for spec in ANALYSIS_SPEC if options.get(spec[0], False)]
+            if total_proteins == 0 or not requested:
+                return self._empty_summary(total_proteins)
+            
             summary = {'total_proteins': total_proteins}
     
-            # Count data completeness only for analyses that were actually requested
-        
-            # UniProt analysis - check for function data (core UniProt field)
-            if options.get('uniprot', False):
-                uniprot_complete = sum(1 for _, row in results.iterrows() 
-                                    if self._is_data_complete(row.get('function', '')))
-                summary['uniprot_complete'] = uniprot_complete
-                summary['uniprot_percent'] = (uniprot_complete / total_proteins) * 100 if total_proteins > 0 else 0
-        
-            # ProtParam analysis - check for molecular weight data
-            if options.get('protparam', False):
-                protparam_complete = sum(1 for _, row in results.iterrows() 
-                                    if self._is_data_complete(row.get('mw', '')))
-                summary['protparam_complete'] = protparam_complete
-                summary['protparam_percent'] = (protparam_complete / total_proteins) * 100 if total_proteins > 0 else 0
+            # Count data completeness only for analyses that were actually requested, building every
+            # mask first and reducing them all in one sum
+            complete_masks = pd.DataFrame({
+                prefix: self._complete_mask(results, column, check_zero)
+                for option_key, prefix, column, check_zero, display_name, requires in requested
+            }, index=results.index)
+            complete_counts = complete_masks.sum()
             
-            # BLAST analysis - check for identity data
-            if options.get('blast', False):
-                blast_complete = sum(1 for _, row in results.iterrows() 
-                                if self._is_data_complete(row.get('identity', '')))
-                summary['blast_complete'] = blast_complete
-                summary['blast_percent'] = (blast_complete / total_proteins) * 100 if total_proteins > 0 else 0
-            
-            # PDB analysis - check for structure count (should be > 0)
-            if options.get('pdb_search', False):
-                pdb_complete = sum(1 for _, row in results.iterrows() 
-                                if self._is_data_complete(row.get('structure_count', ''), check_zero=True))
-                summary['pdb_complete'] = pdb_complete
-                summary['pdb_percent'] = (pdb_complete / total_proteins) * 100 if total_proteins > 0 else 0
-    
-            # FIXED: Human protein analyses - use correct column names
-            if options.get('compartments', False):
-                # Check the actual COMPARTMENTS column name from human_protein_analyzer.py
-                compartments_complete = sum(1 for _, row in results.iterrows() 
-                                        if self._is_data_complete(row.get('compartments_primary_location', '')))
-                summary['compartments_complete'] = compartments_complete
-                summary['compartments_percent'] = (compartments_complete / total_proteins) * 100 if total_proteins > 0 else 0
-    
-            if options.get('hpa', False):
-                # Check the actual HPA column name from human_protein_analyzer.py
-                hpa_complete = sum(1 for _, row in results.iterrows() 
-                                if self._is_data_complete(row.get('hpa_primary_tissue', '')))
-                summary['hpa_complete'] = hpa_complete
-                summary['hpa_percent'] = (hpa_complete / total_proteins) * 100 if total_proteins > 0 else 0
-    
-            # Set to 0 for analyses that weren't requested (to avoid showing in completion dialog)
-            if not options.get('uniprot', False):
-                summary['uniprot_complete'] = 0
-                summary['uniprot_percent'] = 0
-            if not options.get('protparam', False):
-                summary['protparam_complete'] = 0
-                summary['protparam_percent'] = 0
-            if not options.get('blast', False):
-                summary['blast_complete'] = 0
-                summary['blast_percent'] = 0
-            if not options.get('pdb_search', False):
-                summary['pdb_complete'] = 0
-                summary['pdb_percent'] = 0
-            if not options.get('compartments', False):
-                summary['compartments_complete'] = 0
-                summary['compartments_percent'] = 0
-            if not options.get('hpa', False):
-                summary['hpa_complete'] = 0
-                summary['hpa_percent'] = 0
+            # Analyses that weren't requested are set to 0 (to avoid showing in completion dialog)
+            for option_key, prefix, column, check_zero, display_name, requires in ANALYSIS_SPEC:
+                complete = int(complete_counts.get(prefix, 0))
+                summary[f'{prefix}_complete'] = complete
+                summary[f'{prefix}_percent'] = (complete / total_proteins) * 100
     
             return summary
     
         except Exception as e:
             self.logger.error(f"Error calculating analysis summary: {e}")
-            return {
-                'total_proteins': len(results) if results is not None else 0,
-                'uniprot_complete': 0,
-                'uniprot_percent': 0,
-                'protparam_complete': 0,
-                'protparam_percent': 0,
-                'blast_complete': 0,
-                'blast_percent': 0,
-                'pdb_complete': 0,
-                'pdb_percent': 0,
-                'compartments_complete': 0,
-                'compartments_percent': 0,
-                'hpa_complete': 0,
-                'hpa_percent': 0
-            }
-    
-    def _is_data_complete(self, value, check_zero=False):
-        """Check if data value indicates completion"""
-        if value is None:
-            return False
+            return self._empty_summary(len(results) if results is not None else 0)
+    
+    def _empty_summary(self, total_proteins):
+        """Analysis summary with every analysis at zero"""
+        summary = {'total_proteins': total_proteins}
+        for spec in ANALYSIS_SPEC:
+            summary[f'{spec[1]}_complete'] = 0
+            summary[f'{spec[1]}_percent'] = 0
+        return summary
+    
+    def _count_complete(self, results, column, check_zero=False):
+        """Count rows whose column value indicates completion"""
+        return int(self._complete_mask(results, column, check_zero).sum())
+    
+    def _complete_mask(self, results, column, check_zero=False):
+        """Boolean mask of rows whose column value indicates completion"""
+        import pandas as pd
         
-        value_str = str(value).strip().upper()
+        if column not in results:
+            return pd.Series(False, index=results.index)
         
-        # Check for no value indicators
-        if value_str in ['', 'NO VALUE FOUND', 'NAN', 'NONE', 'N/A']:
-            return False
+        # Purely numeric columns (e.g. a fully populated mw) can only be missing as NaN, so skip
+        # converting every number to a string
+        series = results[column]
+        if series.dtype.kind in 'iuf':
+            return (series > 0) if check_zero else series.notna()
+        
+        values = series.astype(str).str.strip()
+        complete = ~values.str.upper().isin(NO_VALUE_MARKERS)
         
         # For PDB structure count, check if it's a positive number
         if check_zero:
-            try:
-                num_value = float(value_str)
-                return num_value > 0
-            except (ValueError, TypeError):
-                return False
+            complete &= pd.to_numeric(values, errors='coerce') > 0
         
-        return True
+        return complete
     
     def _log_completion_summary(self, output_file, results, options):
         """Log analysis completion summary - Fixed to only show analyses that were actually run"""
@@ -314,19 +480,10 @@ class ProtMerge:
             analyses_skipped = []
         
             # Check each analysis type
-            analysis_checks = [
-                ('compartments', 'COMPARTMENTS', 'compartments_complete', 'compartments_percent'),
-                ('hpa', 'Human Protein Atlas', 'hpa_complete', 'hpa_percent'),
-                ('uniprot', 'UniProt', 'uniprot_complete', 'uniprot_percent'),
-                ('protparam', 'ProtParam', 'protparam_complete', 'protparam_percent'),
-                ('blast', 'BLAST', 'blast_complete', 'blast_percent'),
-                ('pdb_search', 'PDB Structures', 'pdb_complete', 'pdb_percent')
-            ]
-            
-            for option_key, display_name, complete_key, percent_key in analysis_checks:
+            for option_key, prefix, column, check_zero, display_name, requires in ANALYSIS_SPEC:
                 if options.get(option_key, False):
-                    complete_count = summary[complete_key]
-                    percent = summary[percent_key]
+                    complete_count = summary[f'{prefix}_complete']
+                    percent = summary[f'{prefix}_percent']
                     self.logger.info(f"{display_name}: {complete_count}/{summary['total_proteins']} ({percent:.1f}%)")
                     analyses_run.append(display_name)
                     
@@ -351,9 +508,17 @@ class ProtMerge:
             
                 # List actually created sheets
                 try:
-                    from openpyxl import load_workbook
-                    wb = load_workbook(output_file)
-                    actual_sheets = [ws for ws in wb.sheetnames if any(name in ws for name in ['ProtMerge', 'Amino', 'PDB', 'Human', 'Similarity'])]
+                    # The formatter knows the sheets it just saved; only reopen the file (lazily,
+                    # without parsing any cells) when it doesn't, e.g. after an emergency backup
+                    sheet_names = self.excel_formatter.saved_sheet_names
+                    if sheet_names is None:
+                        from openpyxl import load_workbook
+                        wb = load_workbook(output_file, read_only=True, keep_links=False)
+                        try:
+                            sheet_names = wb.sheetnames
+                        finally:
+                            wb.close()
+                    actual_sheets = list(filter(RESULT_SHEET_PATTERN.search, sheet_names))
                     self.logger.info(f"Excel sheets created: {', '.join(actual_sheets)}")
                 except Exception:
                     self.logger.info("Excel file created (sheet details unavailable)")
@@ -367,12 +532,10 @@ class ProtMerge:
         """Check if all dependencies are available"""
         missing_deps = []
         
-        # Check core dependencies
+        # Check core dependencies - find_spec locates each package without running its import
         core_deps = ['pandas', 'requests', 'openpyxl', 'lxml']
         for dep in core_deps:
-            try:
-                __import__(dep)
-            except ImportError:
+            if importlib.util.find_spec(dep) is None:
                 missing_deps.append(dep)
         
         if missing_deps:
@@ -390,15 +553,35 @@ def setup_logging():
     log_dir = Path("logs")
     log_dir.mkdir(exist_ok=True)
     
-    # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format=log_format,
-        handlers=[
-            logging.FileHandler(log_dir / f"protmerge_{int(time.time())}.log"),
-            logging.StreamHandler(sys.stdout)
-        ]
-    )
+    # Remove old run logs in one pass, keeping the most recent ones
+    old_logs = sorted(log_dir.glob("protmerge_*.log*"), key=lambda path: path.stat().st_mtime, reverse=True)
+    for old_log in old_logs[LOG_FILES_KEPT - 1:]:
+        try:
+            old_log.unlink()
+        except OSError:
+            pass
+    
+    formatter = logging.Formatter(log_format)
+    handlers = [
+        # delay=True leaves the file unopened until the first record is written
+        logging.handlers.RotatingFileHandler(log_dir / f"protmerge_{int(time.time())}.log",
+                                             maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, delay=True),
+        logging.StreamHandler(sys.stdout)
+    ]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    # Loggers only enqueue records; a background listener does the file and console writes,
+    # so logging from the analysis loops never blocks on I/O
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    # Configure logging - records are formatted by the listener's handlers, not the queue handler
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.INFO)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
     
     # Reduce noise from external libraries
     logging.getLogger('urllib3').setLevel(logging.WARNING)
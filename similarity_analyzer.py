@@ -6,8 +6,99 @@ import pandas as pd
 import numpy as np  # FIXED: Added missing numpy import - this was causing crashes
 import re
 import logging
-import math
-from typing import Dict, List, Tuple, Optional, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Tuple, Any
+from config import INVALID_VALUES
+from similarity_dependencies import valid_value_mask
+
+# Optional: compiled, multithreaded kernels for the numeric similarity matrices (numba)
+try:
+    import numba
+except ImportError:
+    numba = None
+
+prange = numba.prange if numba is not None else range
+
+# numba's default workqueue threading layer can't run parallel kernels from several threads at once
+_kernel_lock = threading.Lock()
+
+# Scores and the property arrays behind them are stored in single precision: similarities lie in [0, 1],
+# and float32 halves the memory traffic of the N x N matrices
+SCORE_DTYPE = np.float32
+
+# Similarity categories computed concurrently (NumPy releases the GIL in the matrix operations)
+SIMILARITY_MAX_WORKERS = 4
+
+# Data-driven weights: (source column, category, weight, completeness needed to include it).
+# Core properties first, then optional ones
+ADAPTIVE_WEIGHTS = (
+    ('sequence', 'sequence_length', 0.2, 0.3),
+    ('mw', 'molecular_weight', 0.25, 0.3),
+    ('pi', 'isoelectric_point', 0.2, 0.3),
+    ('gravy', 'gravy_score', 0.15, 0.3),
+    ('keywords', 'functional_keywords', 0.1, 0.3),
+    ('organism', 'organism_similarity', 0.1, 0.5)
+)
+
+# Amino acid composition columns, stored as "count_percentage%" (e.g. "20_12.3%")
+AMINO_ACID_KEYS = ('ala', 'arg', 'asn', 'asp', 'cys', 'gln', 'glu', 'gly',
+                   'his', 'ile', 'leu', 'lys', 'met', 'phe', 'pro', 'ser',
+                   'thr', 'trp', 'tyr', 'val')
+# Second "_"-separated field with trailing "%" removed, i.e. value.split('_')[1].rstrip('%')
+AMINO_ACID_PERCENT_PATTERN = re.compile(r'^[^_]*_([^_]*?)%*(?:_|$)')
+
+
+def _ratio_kernel(values):
+    """Pairwise min/max ratio of positive values, filled in one pass without N x N temporaries."""
+    n = values.shape[0]
+    matrix = np.zeros((n, n), dtype=SCORE_DTYPE)
+    for i in prange(n):
+        a = values[i]
+        if not a > 0:
+            continue
+        for j in range(i + 1, n):
+            b = values[j]
+            if b > 0:
+                ratio = min(a, b) / max(a, b)
+                matrix[i, j] = ratio
+                matrix[j, i] = ratio
+    return matrix
+
+
+def _difference_kernel(values, scale):
+    """Pairwise 1 - |difference| / scale floored at 0, filled in one pass without N x N temporaries."""
+    n = values.shape[0]
+    matrix = np.zeros((n, n), dtype=SCORE_DTYPE)
+    for i in prange(n):
+        a = values[i]
+        if np.isnan(a):
+            continue
+        for j in range(i + 1, n):
+            b = values[j]
+            if not np.isnan(b):
+                similarity = max(0.0, 1.0 - (abs(a - b) / scale))
+                matrix[i, j] = similarity
+                matrix[j, i] = similarity
+    return matrix
+
+
+def _valid_pairs_matrix(valid: np.ndarray, pair_matrix, *columns: np.ndarray) -> np.ndarray:
+    """N x N matrix with pair_matrix evaluated on the valid proteins only; pairs involving an invalid one are 0."""
+    if valid.all():
+        return pair_matrix(*columns)
+    
+    n = valid.shape[0]
+    matrix = np.zeros((n, n), dtype=SCORE_DTYPE)
+    idx = np.flatnonzero(valid)
+    if idx.size:
+        matrix[np.ix_(idx, idx)] = pair_matrix(*(column[idx] for column in columns))
+    return matrix
+
+
+if numba is not None:
+    _ratio_kernel = numba.njit(parallel=True, cache=True)(_ratio_kernel)
+    _difference_kernel = numba.njit(parallel=True, cache=True)(_difference_kernel)
 
 
 class SimilarityAnalyzer:
@@ -22,21 +113,24 @@ class SimilarityAnalyzer:
         
         # Core data storage
         self.protein_data = None
-        self.precomputed_scores = {}
+        self.protein_ids = []
+        self.protein_index = {}  # UniProt ID -> row of its first occurrence
+        self.score_tensor = None  # C x N x N similarity scores, one N x N matrix per category
         self.data_quality_scores = {}
         
-        # Available similarity functions
+        # Available similarity functions, each building the N x N matrix for its category
         self.similarity_functions = {
-            'sequence_length': self._calc_sequence_length_similarity,
-            'molecular_weight': self._calc_molecular_weight_similarity,
-            'isoelectric_point': self._calc_isoelectric_point_similarity,
-            'gravy_score': self._calc_gravy_similarity,
-            'sequence_identity': self._calc_sequence_identity_similarity,
-            'functional_keywords': self._calc_functional_keywords_similarity,
-            'organism_similarity': self._calc_organism_similarity,
-            'extinction_coefficient': self._calc_extinction_coefficient_similarity,
-            'amino_acid_composition': self._calc_amino_acid_similarity,
+            'sequence_length': self._sequence_length_matrix,
+            'molecular_weight': self._molecular_weight_matrix,
+            'isoelectric_point': self._isoelectric_point_matrix,
+            'gravy_score': self._gravy_matrix,
+            'sequence_identity': self._sequence_identity_matrix,
+            'functional_keywords': self._functional_keywords_matrix,
+            'organism_similarity': self._organism_matrix,
+            'extinction_coefficient': self._extinction_coefficient_matrix,
+            'amino_acid_composition': self._amino_acid_matrix,
         }
+        self.category_index = {category: k for k, category in enumerate(self.similarity_functions)}
         
         self.logger.info("SimilarityAnalyzer initialized successfully")
     
@@ -59,45 +153,53 @@ class SimilarityAnalyzer:
             raise ValueError(f"Need at least 2 proteins for similarity analysis, got {len(results)}")
         
         self.protein_data = results.copy()
-        protein_ids = results['UniProt_ID'].tolist()
+        self.protein_ids = results['UniProt_ID'].tolist()
+        self.protein_index = {}
+        for i, protein_id in enumerate(self.protein_ids):
+            self.protein_index.setdefault(protein_id, i)
         
-        self.logger.info(f"Analyzing {len(protein_ids)} proteins")
+        self.logger.info(f"Analyzing {len(self.protein_ids)} proteins")
         
         # Calculate data quality scores
         self._calculate_data_quality_scores()
         
-        # Pre-compute pairwise similarities
-        total_pairs = len(protein_ids) * (len(protein_ids) - 1) // 2
-        computed_pairs = 0
+        # Extract each compared property once as a typed array
+        self._precompute_arrays()
+        
+        # Pre-compute pairwise similarities, one N x N matrix per category
+        total_pairs = len(self.protein_ids) * (len(self.protein_ids) - 1) // 2
+        total_categories = len(self.similarity_functions)
+        score_tensor = np.zeros((total_categories, len(self.protein_ids), len(self.protein_ids)), dtype=SCORE_DTYPE)
         
         self.logger.info(f"Computing {total_pairs} protein pair similarities")
         
-        for i, protein1 in enumerate(protein_ids):
-            for j, protein2 in enumerate(protein_ids):
-                if i >= j:  # Only compute upper triangle
-                    continue
-                
-                pair_key = (protein1, protein2)
-                
+        def compute_category(category, matrix_function):
+            # Ensure valid scores; each category writes only its own layer of the tensor
+            matrix = matrix_function()
+            score_tensor[self.category_index[category]] = np.clip(np.nan_to_num(matrix, nan=0.0), 0.0, 1.0)
+        
+        with ThreadPoolExecutor(max_workers=SIMILARITY_MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(compute_category, category, matrix_function): category
+                for category, matrix_function in self.similarity_functions.items()
+            }
+            
+            for k, future in enumerate(as_completed(futures), 1):
                 try:
-                    scores = self._compute_pairwise_similarities(protein1, protein2)
-                    self.precomputed_scores[pair_key] = scores
+                    future.result()
                 except Exception as e:
-                    self.logger.warning(f"Error computing similarity for {protein1}-{protein2}: {e}")
-                    # Store zeros for failed computations
-                    self.precomputed_scores[pair_key] = {func: 0.0 for func in self.similarity_functions.keys()}
-                
-                computed_pairs += 1
+                    # Failed computations keep their zeros
+                    self.logger.warning(f"Error computing {futures[future]} similarity: {e}")
                 
-                # Progress reporting
-                if progress_callback and computed_pairs % max(1, total_pairs // 20) == 0:
-                    progress = (computed_pairs / total_pairs) * 90  # Reserve 10% for final processing
-                    progress_callback(progress, f"Computing similarities ({computed_pairs}/{total_pairs})")
+                if progress_callback:
+                    progress = (k / total_categories) * 90  # Reserve 10% for final processing
+                    progress_callback(progress, f"Computing similarities ({k}/{total_categories} categories)")
         
         if progress_callback:
             progress_callback(100, "Similarity pre-computation complete")
         
-        self.logger.info(f"Successfully computed {computed_pairs} protein pair similarities")
+        self.score_tensor = score_tensor
+        self.logger.info(f"Successfully computed {total_pairs} protein pair similarities")
     
     def calculate_similarity_matrix(self, central_protein_id: str, weights: Dict[str, float]) -> pd.DataFrame:
         """
@@ -113,9 +215,9 @@ class SimilarityAnalyzer:
         if self.protein_data is None:
             raise ValueError("Must run analyze() first")
         
-        protein_ids = self.protein_data['UniProt_ID'].tolist()
+        protein_ids = self.protein_ids
         
-        if central_protein_id not in protein_ids:
+        if central_protein_id not in self.protein_index:
             raise ValueError(f"Central protein {central_protein_id} not found in dataset")
         
         self.logger.info(f"Calculating similarity matrix for central protein: {central_protein_id}")
@@ -130,371 +232,220 @@ class SimilarityAnalyzer:
         if total_weight > 0:
             valid_weights = {k: v/total_weight for k, v in valid_weights.items()}
         
-        # Calculate similarities
-        similarities = []
-        
-        for protein_id in protein_ids:
-            if protein_id == central_protein_id:
-                continue
-            
-            try:
-                # Get precomputed scores
-                pair_key = (min(central_protein_id, protein_id), max(central_protein_id, protein_id))
-                
-                if pair_key not in self.precomputed_scores:
-                    self.logger.warning(f"No precomputed scores for {pair_key}")
-                    continue
-                
-                scores = self.precomputed_scores[pair_key]
-                
-                # Calculate weighted overall similarity
-                overall_similarity = self._calculate_weighted_similarity(scores, valid_weights)
-                
-                # Create result record
-                result = {
-                    'protein_id': protein_id,
-                    'overall_similarity': overall_similarity,
-                    'data_quality': self.data_quality_scores.get(protein_id, 0.0)
-                }
-                
-                # Add individual category scores
-                for category, score in scores.items():
-                    result[category] = score
-                
-                similarities.append(result)
-                
-            except Exception as e:
-                self.logger.warning(f"Error processing {protein_id}: {e}")
-                continue
-        
-        # Convert to DataFrame and sort
-        if similarities:
-            df = pd.DataFrame(similarities)
-            df = df.sort_values('overall_similarity', ascending=False)
-            self.logger.info(f"Generated similarity matrix with {len(df)} proteins")
-            return df
-        else:
+        # Scores of every other protein against the central one
+        central_idx = self.protein_index[central_protein_id]
+        other_ids = [protein_id for protein_id in protein_ids if protein_id != central_protein_id]
+        if not other_ids:
             self.logger.warning("No similarity results generated")
             return pd.DataFrame()
-    
-    def _compute_pairwise_similarities(self, protein1: str, protein2: str) -> Dict[str, float]:
-        """Compute all similarity scores between two proteins."""
-        scores = {}
-        
-        for category, func in self.similarity_functions.items():
-            try:
-                score = func(protein1, protein2)
-                # Ensure valid score
-                if score is None or (isinstance(score, float) and math.isnan(score)):
-                    scores[category] = 0.0
-                else:
-                    scores[category] = max(0.0, min(1.0, float(score)))
-            except Exception as e:
-                self.logger.debug(f"Error in {category} for {protein1}-{protein2}: {e}")
-                scores[category] = 0.0
-        
-        return scores
-    
-    def _calculate_weighted_similarity(self, scores: Dict[str, float], weights: Dict[str, float]) -> float:
-        """Calculate weighted average similarity."""
-        total_score = 0.0
-        total_weight = 0.0
         
-        for category, score in scores.items():
-            weight = weights.get(category, 0.0)
-            if weight > 0 and isinstance(score, (int, float)):
-                total_score += score * weight
-                total_weight += weight
+        categories = list(self.category_index)
+        other_idx = [self.protein_index[protein_id] for protein_id in other_ids]
+        scores = self.score_tensor[:, central_idx, other_idx].astype(float)  # C x (N - 1)
         
-        return total_score / total_weight if total_weight > 0 else 0.0
-    
-    def _get_protein_data(self, protein_id: str) -> pd.Series:
-        """Get data for a specific protein."""
-        mask = self.protein_data['UniProt_ID'] == protein_id
-        matches = self.protein_data[mask]
-        
-        if matches.empty:
-            raise ValueError(f"Protein {protein_id} not found")
-        
-        return matches.iloc[0]
+        # Weighted average over the categories that have a weight, for all proteins in one product
+        category_weights = np.array([valid_weights.get(category, 0.0) for category in categories])
+        weight_sum = category_weights.sum()
+        if weight_sum > 0:
+            overall_similarity = (category_weights @ scores) / weight_sum
+        else:
+            overall_similarity = np.zeros(len(other_ids))
+        
+        # Build the DataFrame from columns and sort
+        df = pd.DataFrame({
+            'protein_id': other_ids,
+            'overall_similarity': overall_similarity,
+            'data_quality': [self.data_quality_scores.get(protein_id, 0.0) for protein_id in other_ids],
+            **{category: scores[k] for k, category in enumerate(categories)}
+        })
+        df = df.sort_values('overall_similarity', ascending=False)
+        self.logger.info(f"Generated similarity matrix with {len(df)} proteins")
+        return df
     
     def _is_valid_value(self, value) -> bool:
         """Check if a value is valid (not missing or placeholder)."""
-        if value is None or pd.isna(value):
+        if value is None:
             return False
         
-        value_str = str(value).strip().upper()
-        invalid_values = {'', 'NO VALUE FOUND', 'NAN', 'NONE', 'N/A', 'UNKNOWN', 'NULL'}
+        # Numbers are valid unless NaN, without going through a string
+        if isinstance(value, (int, float)):
+            return value == value
+        
+        if pd.isna(value):
+            return False
         
-        return value_str not in invalid_values
+        return str(value).strip().upper() not in INVALID_VALUES
     
     def _calculate_data_quality_scores(self):
         """Calculate data completeness score for each protein."""
-        self.data_quality_scores = {}
-        
         # Fields to check for quality assessment
         quality_fields = ['sequence', 'mw', 'pi', 'gravy', 'ext', 'function', 'keywords', 'organism']
         
-        for _, row in self.protein_data.iterrows():
-            protein_id = row['UniProt_ID']
-            available_count = 0
-            
-            for field in quality_fields:
-                if field in row and self._is_valid_value(row[field]):
-                    available_count += 1
-            
-            quality_score = available_count / len(quality_fields)
-            self.data_quality_scores[protein_id] = quality_score
+        # Count valid fields per protein column by column; missing columns count as unavailable
+        available_count = np.zeros(len(self.protein_data))
+        for field in quality_fields:
+            if field in self.protein_data.columns:
+                available_count += valid_value_mask(self.protein_data[field]).to_numpy()
+        
+        quality_scores = available_count / len(quality_fields)
+        self.data_quality_scores = dict(zip(self.protein_data['UniProt_ID'], quality_scores.tolist()))
+    
+    def _precompute_arrays(self):
+        """Extract the numeric properties compared between proteins as float arrays."""
+        if 'sequence' in self.protein_data.columns:
+            sequences = self.protein_data['sequence']
+            self.sequence_lengths = (sequences.astype(str).str.len()
+                                     .where(valid_value_mask(sequences), 0).to_numpy(dtype=SCORE_DTYPE))
+        else:
+            self.sequence_lengths = np.zeros(len(self.protein_data), dtype=SCORE_DTYPE)
+        
+        self.numeric_columns = {
+            column: self._numeric_array(column) for column in ('mw', 'pi', 'gravy', 'ext', 'identity')
+        }
+    
+    def _column_values(self, column: str) -> List[Any]:
+        """Values of a protein data column, or None for every protein if the column is absent."""
+        if column not in self.protein_data.columns:
+            return [None] * len(self.protein_data)
+        return self.protein_data[column].tolist()
+    
+    def _numeric_array(self, column: str) -> np.ndarray:
+        """Column values as floats, NaN where missing or not numeric."""
+        if column not in self.protein_data.columns:
+            return np.full(len(self.protein_data), np.nan, dtype=SCORE_DTYPE)
+        return pd.to_numeric(self.protein_data[column], errors='coerce').to_numpy(dtype=SCORE_DTYPE, na_value=np.nan)
+    
+    @staticmethod
+    def _ratio_matrix(values: np.ndarray) -> np.ndarray:
+        """Pairwise min/max ratio, 0 where either value is missing or not positive."""
+        if numba is not None:
+            with _kernel_lock:
+                return _ratio_kernel(values)
+        
+        def ratio(v):
+            # One division matrix: min(a/b, b/a) is min/max, and b/a is its transpose
+            with np.errstate(invalid='ignore'):  # inf / inf
+                quotient = v[:, None] / v[None, :]
+            return np.minimum(quotient, quotient.T)
+        
+        return _valid_pairs_matrix(values > 0, ratio, values)  # NaN compares False
+    
+    @staticmethod
+    def _difference_matrix(values: np.ndarray, scale: float) -> np.ndarray:
+        """Pairwise 1 - |difference| / scale, floored at 0, and 0 where either value is missing."""
+        if numba is not None:
+            with _kernel_lock:
+                return _difference_kernel(values, scale)
+        
+        def difference(v):
+            with np.errstate(invalid='ignore'):  # inf - inf
+                return np.maximum(0.0, 1.0 - (np.abs(np.subtract.outer(v, v)) / scale))
+        
+        return _valid_pairs_matrix(~np.isnan(values), difference, values)
     
     # =============================================================================
     # SIMILARITY CALCULATION FUNCTIONS
     # =============================================================================
     
-    def _calc_sequence_length_similarity(self, p1: str, p2: str) -> float:
+    def _sequence_length_matrix(self) -> np.ndarray:
         """Compare sequence lengths using ratio method."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            seq1 = data1.get('sequence', '')
-            seq2 = data2.get('sequence', '')
-            
-            if not self._is_valid_value(seq1) or not self._is_valid_value(seq2):
-                return 0.0
-            
-            len1, len2 = len(str(seq1)), len(str(seq2))
-            if len1 == 0 or len2 == 0:
-                return 0.0
-            
-            return min(len1, len2) / max(len1, len2)
-        except Exception:
-            return 0.0
+        return self._ratio_matrix(self.sequence_lengths)
     
-    def _calc_molecular_weight_similarity(self, p1: str, p2: str) -> float:
+    def _molecular_weight_matrix(self) -> np.ndarray:
         """Compare molecular weights using ratio method."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            mw1 = data1.get('mw', None)
-            mw2 = data2.get('mw', None)
-            
-            if not self._is_valid_value(mw1) or not self._is_valid_value(mw2):
-                return 0.0
-            
-            mw1_val, mw2_val = float(mw1), float(mw2)
-            if mw1_val <= 0 or mw2_val <= 0:
-                return 0.0
-            
-            return min(mw1_val, mw2_val) / max(mw1_val, mw2_val)
-        except (ValueError, TypeError):
-            return 0.0
-    
-    def _calc_isoelectric_point_similarity(self, p1: str, p2: str) -> float:
-        """Compare isoelectric points normalized over pH scale."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            pi1 = data1.get('pi', None)
-            pi2 = data2.get('pi', None)
-            
-            if not self._is_valid_value(pi1) or not self._is_valid_value(pi2):
-                return 0.0
-            
-            pi1_val, pi2_val = float(pi1), float(pi2)
-            diff = abs(pi1_val - pi2_val)
-            
-            # Normalize over pH scale (0-14)
-            return max(0.0, 1.0 - (diff / 14.0))
-        except (ValueError, TypeError):
-            return 0.0
-    
-    def _calc_gravy_similarity(self, p1: str, p2: str) -> float:
-        """Compare GRAVY scores normalized over typical range."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            gravy1 = data1.get('gravy', None)
-            gravy2 = data2.get('gravy', None)
-            
-            if not self._is_valid_value(gravy1) or not self._is_valid_value(gravy2):
-                return 0.0
-            
-            gravy1_val, gravy2_val = float(gravy1), float(gravy2)
-            diff = abs(gravy1_val - gravy2_val)
-            
-            # GRAVY typically ranges from -2 to +2
-            return max(0.0, 1.0 - (diff / 4.0))
-        except (ValueError, TypeError):
-            return 0.0
-    
-    def _calc_sequence_identity_similarity(self, p1: str, p2: str) -> float:
-        """Compare sequence identity from BLAST data."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            identity1 = data1.get('identity', None)
-            identity2 = data2.get('identity', None)
-            
-            if not self._is_valid_value(identity1) or not self._is_valid_value(identity2):
-                return 0.0
-            
-            id1_val, id2_val = float(identity1), float(identity2)
-            diff = abs(id1_val - id2_val)
-            
-            # Normalize over 0-100% range
-            return max(0.0, 1.0 - (diff / 100.0))
-        except (ValueError, TypeError):
-            return 0.0
+        return self._ratio_matrix(self.numeric_columns['mw'])
     
-    def _calc_functional_keywords_similarity(self, p1: str, p2: str) -> float:
-        """Compare functional keywords using Jaccard similarity."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            kw1 = data1.get('keywords', '')
-            kw2 = data2.get('keywords', '')
-            
-            if not self._is_valid_value(kw1) or not self._is_valid_value(kw2):
-                return 0.0
-            
-            # Parse keywords
-            set1 = set(kw.strip().lower() for kw in str(kw1).split(';') if kw.strip())
-            set2 = set(kw.strip().lower() for kw in str(kw2).split(';') if kw.strip())
-            
-            if not set1 or not set2:
-                return 0.0
-            
-            # Jaccard similarity
-            intersection = len(set1.intersection(set2))
-            union = len(set1.union(set2))
-            
-            return intersection / union if union > 0 else 0.0
-        except Exception:
-            return 0.0
-    
-    def _calc_organism_similarity(self, p1: str, p2: str) -> float:
-        """Compare organism similarity."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            org1 = data1.get('organism', '')
-            org2 = data2.get('organism', '')
-            
-            if not self._is_valid_value(org1) or not self._is_valid_value(org2):
-                return 0.0
-            
-            org1_str = str(org1).lower().strip()
-            org2_str = str(org2).lower().strip()
-            
-            # Exact match
-            if org1_str == org2_str:
-                return 1.0
-            
-            # Genus match (first word)
-            try:
-                genus1 = org1_str.split()[0]
-                genus2 = org2_str.split()[0]
-                return 0.5 if genus1 == genus2 else 0.0
-            except IndexError:
-                return 0.0
-        except Exception:
-            return 0.0
-    
-    def _calc_extinction_coefficient_similarity(self, p1: str, p2: str) -> float:
+    def _isoelectric_point_matrix(self) -> np.ndarray:
+        """Compare isoelectric points normalized over pH scale (0-14)."""
+        return self._difference_matrix(self.numeric_columns['pi'], 14.0)
+    
+    def _gravy_matrix(self) -> np.ndarray:
+        """Compare GRAVY scores normalized over typical range (-2 to +2)."""
+        return self._difference_matrix(self.numeric_columns['gravy'], 4.0)
+    
+    def _sequence_identity_matrix(self) -> np.ndarray:
+        """Compare BLAST sequence identity normalized over 0-100% range."""
+        return self._difference_matrix(self.numeric_columns['identity'], 100.0)
+    
+    def _extinction_coefficient_matrix(self) -> np.ndarray:
         """Compare extinction coefficients using ratio method."""
-        try:
-            data1 = self._get_protein_data(p1)
-            data2 = self._get_protein_data(p2)
-            
-            ext1 = data1.get('ext', None)
-            ext2 = data2.get('ext', None)
-            
-            if not self._is_valid_value(ext1) or not self._is_valid_value(ext2):
-                return 0.0
-            
-            ext1_val, ext2_val = float(ext1), float(ext2)
-            if ext1_val <= 0 or ext2_val <= 0:
-                return 0.0
-            
-            return min(ext1_val, ext2_val) / max(ext1_val, ext2_val)
-        except (ValueError, TypeError):
-            return 0.0
-    
-    def _calc_amino_acid_similarity(self, p1: str, p2: str) -> float:
-        """Compare amino acid composition using simple correlation."""
-        try:
-            comp1 = self._get_amino_acid_vector(p1)
-            comp2 = self._get_amino_acid_vector(p2)
-            
-            if comp1 is None or comp2 is None:
-                return 0.0
-            
-            # Simple correlation-based similarity
-            return self._calculate_vector_similarity(comp1, comp2)
-        except Exception:
-            return 0.0
-    
-    def _get_amino_acid_vector(self, protein_id: str) -> Optional[List[float]]:
-        """Get amino acid composition as percentage vector."""
-        try:
-            data = self._get_protein_data(protein_id)
-            
-            aa_percentages = []
-            aa_keys = ['ala', 'arg', 'asn', 'asp', 'cys', 'gln', 'glu', 'gly', 
-                      'his', 'ile', 'leu', 'lys', 'met', 'phe', 'pro', 'ser', 
-                      'thr', 'trp', 'tyr', 'val']
-            
-            for aa_key in aa_keys:
-                aa_value = data.get(aa_key, '0_0.0%')
-                
-                if self._is_valid_value(aa_value):
-                    try:
-                        # Extract percentage from format "20_12.3%"
-                        value_str = str(aa_value)
-                        if '_' in value_str and '%' in value_str:
-                            percentage = float(value_str.split('_')[1].rstrip('%'))
-                            aa_percentages.append(percentage)
-                        else:
-                            aa_percentages.append(0.0)
-                    except (IndexError, ValueError):
-                        aa_percentages.append(0.0)
-                else:
-                    aa_percentages.append(0.0)
-            
-            # Return only if we have some data
-            return aa_percentages if any(p > 0 for p in aa_percentages) else None
-        except Exception:
-            return None
-    
-    def _calculate_vector_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate similarity between two vectors using cosine similarity."""
-        try:
-            # Convert to numpy arrays
-            v1 = np.array(vec1, dtype=float)
-            v2 = np.array(vec2, dtype=float)
-            
-            # Check for valid data
-            if len(v1) != len(v2) or len(v1) == 0:
-                return 0.0
-            
-            # Calculate norms
-            norm1 = np.linalg.norm(v1)
-            norm2 = np.linalg.norm(v2)
-            
-            if norm1 == 0 or norm2 == 0:
-                return 0.0
-            
-            # Cosine similarity
-            similarity = np.dot(v1, v2) / (norm1 * norm2)
-            return max(0.0, float(similarity))
-        except Exception:
-            return 0.0
+        return self._ratio_matrix(self.numeric_columns['ext'])
+    
+    def _functional_keywords_matrix(self) -> np.ndarray:
+        """Compare functional keywords using Jaccard similarity."""
+        # Parse each protein's keywords once
+        keyword_sets = [
+            {kw.strip().lower() for kw in str(keywords).split(';') if kw.strip()}
+            if self._is_valid_value(keywords) else set()
+            for keywords in self._column_values('keywords')
+        ]
+        vocabulary = {}
+        for keyword_set in keyword_sets:
+            for keyword in keyword_set:
+                vocabulary.setdefault(keyword, len(vocabulary))
+        
+        # Binary protein x keyword incidence matrix; its product with itself counts shared keywords
+        incidence = np.zeros((len(keyword_sets), len(vocabulary)), dtype=SCORE_DTYPE)
+        for i, keyword_set in enumerate(keyword_sets):
+            incidence[i, [vocabulary[keyword] for keyword in keyword_set]] = 1.0
+        
+        def jaccard(rows):
+            intersection = rows @ rows.T
+            sizes = rows.sum(axis=1)
+            return intersection / (sizes[:, None] + sizes[None, :] - intersection)
+        
+        # Proteins without keywords score 0 against everything
+        return _valid_pairs_matrix(incidence.any(axis=1), jaccard, incidence)
+    
+    def _organism_matrix(self) -> np.ndarray:
+        """Compare organisms: 1 for the same species, 0.5 for the same genus."""
+        n = len(self.protein_data)
+        if 'organism' not in self.protein_data.columns:
+            return np.zeros((n, n), dtype=SCORE_DTYPE)
+        
+        organisms = self.protein_data['organism']
+        valid = valid_value_mask(organisms).to_numpy()
+        
+        # Normalize names once and compare integer codes instead of strings
+        names = organisms.astype(str).str.lower().str.strip()
+        species = pd.factorize(names)[0]
+        genus = pd.factorize(names.str.split().str[0])[0]
+        
+        def organism_similarity(species, genus):
+            return np.where(species[:, None] == species[None, :], SCORE_DTYPE(1.0),
+                            np.where(genus[:, None] == genus[None, :], SCORE_DTYPE(0.5), SCORE_DTYPE(0.0)))
+        
+        return _valid_pairs_matrix(valid, organism_similarity, species, genus)
+    
+    def _amino_acid_matrix(self) -> np.ndarray:
+        """Compare amino acid composition using cosine similarity of percentage vectors."""
+        # Parse every protein's composition once into an N x 20 matrix
+        composition = np.column_stack([self._amino_acid_percentages(aa_key) for aa_key in AMINO_ACID_KEYS])
+        
+        # Proteins without any composition data score 0 against everything
+        norms = np.linalg.norm(composition, axis=1)
+        valid = (composition > 0).any(axis=1) & (norms > 0)
+        
+        # All cosine similarities in one matrix product
+        def cosine(vectors, vector_norms):
+            with np.errstate(invalid='ignore'):  # inf / inf
+                normalized = vectors / vector_norms[:, None]
+            return np.maximum(normalized @ normalized.T, 0.0)
+        
+        return _valid_pairs_matrix(valid, cosine, composition, norms)
+    
+    def _amino_acid_percentages(self, aa_key: str) -> np.ndarray:
+        """Percentages from an amino acid column formatted as "20_12.3%", 0 where missing or malformed."""
+        if aa_key not in self.protein_data.columns:
+            return np.zeros(len(self.protein_data), dtype=SCORE_DTYPE)
+        
+        values = self.protein_data[aa_key]
+        value_str = values.astype(str)
+        well_formed = valid_value_mask(values) & value_str.str.contains('_', regex=False) & \
+            value_str.str.contains('%', regex=False)
+        
+        percentages = pd.to_numeric(value_str.str.extract(AMINO_ACID_PERCENT_PATTERN, expand=False), errors='coerce')
+        return percentages.where(well_formed, 0.0).fillna(0.0).to_numpy(dtype=SCORE_DTYPE)
     
     def get_available_categories(self) -> Dict[str, str]:
         """Get available similarity categories with descriptions."""
@@ -569,43 +520,14 @@ class SimilarityPresets:
         weights = {}
         weight_sum = 0.0
         
-        # Core properties (always try to include)
-        if 'sequence' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['sequence'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.3:
-                weights['sequence_length'] = 0.2
-                weight_sum += 0.2
-        
-        if 'mw' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['mw'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.3:
-                weights['molecular_weight'] = 0.25
-                weight_sum += 0.25
-        
-        if 'pi' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['pi'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.3:
-                weights['isoelectric_point'] = 0.2
-                weight_sum += 0.2
-        
-        if 'gravy' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['gravy'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.3:
-                weights['gravy_score'] = 0.15
-                weight_sum += 0.15
-        
-        # Optional properties
-        if 'keywords' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['keywords'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.3:
-                weights['functional_keywords'] = 0.1
-                weight_sum += 0.1
-        
-        if 'organism' in protein_data.columns:
-            completeness = sum(1 for v in protein_data['organism'] if pd.notna(v) and str(v) != 'NO VALUE FOUND') / len(protein_data)
-            if completeness > 0.5:
-                weights['organism_similarity'] = 0.1
-                weight_sum += 0.1
+        # Include a category when enough proteins have its source column filled in
+        for column, category, weight, min_completeness in ADAPTIVE_WEIGHTS:
+            if column in protein_data.columns:
+                values = protein_data[column]
+                completeness = (values.notna() & (values.astype(str) != 'NO VALUE FOUND')).mean()
+                if completeness > min_completeness:
+                    weights[category] = weight
+                    weight_sum += weight
         
         # Normalize weights
         if weight_sum > 0:
@@ -667,8 +589,8 @@ def get_similarity_summary(results_df):
     
     for field in fields_to_check:
         if field in results_df.columns:
-            valid_count = sum(1 for v in results_df[field] 
-                            if pd.notna(v) and str(v) not in ['', 'NO VALUE FOUND', 'nan'])
+            values = results_df[field]
+            valid_count = int((values.notna() & ~values.astype(str).isin(['', 'NO VALUE FOUND', 'nan'])).sum())
             availability[field] = f"{valid_count}/{total_proteins} ({valid_count/total_proteins*100:.1f}%)"
         else:
             availability[field] = "Not available"
@@ -2,8 +2,13 @@
 similarity_dependencies.py - Clean dependency handling for ProtMerge similarity analysis
 """
 
+import importlib.util
+import math
+import threading
 import numpy as np
+import pandas as pd
 import logging
+from config import INVALID_VALUES
 
 logger = logging.getLogger(__name__)
 
@@ -20,69 +25,90 @@ class DependencyManager:
         self.matplotlib_available = False
         self.plotly_available = False
         
-        self.cosine_similarity = None
-        self.StandardScaler = None
+        # Resolved on first use, see the cosine_similarity/StandardScaler properties
+        self._cosine_similarity = None
+        self._StandardScaler = None
         
         self._check_dependencies()
     
     def _check_dependencies(self):
-        """Check which dependencies are available"""
+        """Check which dependencies are available (find_spec only, nothing is imported here)"""
         
         # Check scikit-learn
-        try:
-            from sklearn.metrics.pairwise import cosine_similarity as sklearn_cosine
-            from sklearn.preprocessing import StandardScaler as sklearn_scaler
-            self.cosine_similarity = sklearn_cosine
-            self.StandardScaler = sklearn_scaler
-            self.sklearn_available = True
+        self.sklearn_available = importlib.util.find_spec('sklearn') is not None
+        if self.sklearn_available:
             logger.info("scikit-learn available for similarity analysis")
-        except ImportError:
+        else:
             logger.warning("scikit-learn not available, using fallback methods")
-            self.cosine_similarity = self._fallback_cosine_similarity
-            self.StandardScaler = self._fallback_scaler
         
         # Check scipy
-        try:
-            import scipy
-            self.scipy_available = True
+        self.scipy_available = importlib.util.find_spec('scipy') is not None
+        if self.scipy_available:
             logger.info("scipy available for advanced statistics")
-        except ImportError:
+        else:
             logger.warning("scipy not available, some statistics limited")
         
         # Check matplotlib
-        try:
-            import matplotlib
-            self.matplotlib_available = True
-        except ImportError:
+        self.matplotlib_available = importlib.util.find_spec('matplotlib') is not None
+        if not self.matplotlib_available:
             logger.warning("matplotlib not available, some visualizations disabled")
         
         # Check plotly
-        try:
-            import plotly
-            self.plotly_available = True
-        except ImportError:
+        self.plotly_available = importlib.util.find_spec('plotly') is not None
+        if not self.plotly_available:
             logger.warning("plotly not available, interactive plots disabled")
     
-    def _fallback_cosine_similarity(self, X, Y=None):
-        """Fallback cosine similarity implementation"""
+    def _load_sklearn(self):
+        """Import the scikit-learn functions, falling back if the import fails"""
+        if self.sklearn_available:
+            try:
+                from sklearn.metrics.pairwise import cosine_similarity as sklearn_cosine
+                from sklearn.preprocessing import StandardScaler as sklearn_scaler
+                self._cosine_similarity = sklearn_cosine
+                self._StandardScaler = sklearn_scaler
+                return
+            except ImportError as e:
+                logger.warning(f"scikit-learn failed to import ({e}), using fallback methods")
+                self.sklearn_available = False
+        
+        self._cosine_similarity = self._fallback_cosine_similarity
+        self._StandardScaler = self._fallback_scaler
+    
+    @property
+    def cosine_similarity(self):
+        """Cosine similarity function, scikit-learn's if available (imported on first access)"""
+        if self._cosine_similarity is None:
+            self._load_sklearn()
+        return self._cosine_similarity
+    
+    @property
+    def StandardScaler(self):
+        """Scaler class, scikit-learn's if available (imported on first access)"""
+        if self._StandardScaler is None:
+            self._load_sklearn()
+        return self._StandardScaler
+    
+    def _fallback_cosine_similarity(self, X, Y=None, dtype=np.float32):
+        """Fallback cosine similarity implementation (single precision; pass dtype=np.float64 for double)"""
         try:
-            X = np.array(X)
-            if Y is None:
-                Y = X
-            else:
-                Y = np.array(Y)
+            # Contiguous, so the product below is a single SGEMM/DGEMM call
+            X = np.ascontiguousarray(X, dtype=dtype)
+            Y = None if Y is None else np.ascontiguousarray(Y, dtype=dtype)
             
             # Handle single vectors
             if X.ndim == 1:
                 X = X.reshape(1, -1)
-            if Y.ndim == 1:
+            if Y is not None and Y.ndim == 1:
                 Y = Y.reshape(1, -1)
             
-            # Calculate cosine similarity manually
-            X_norm = X / (np.linalg.norm(X, axis=1, keepdims=True) + 1e-8)
-            Y_norm = Y / (np.linalg.norm(Y, axis=1, keepdims=True) + 1e-8)
+            # Calculate cosine similarity manually (row norms via einsum, without a squared copy)
+            X_norm = X / (np.sqrt(np.einsum('ij,ij->i', X, X))[:, None] + 1e-8)
+            if Y is None:
+                Y_norm = X_norm
+            else:
+                Y_norm = Y / (np.sqrt(np.einsum('ij,ij->i', Y, Y))[:, None] + 1e-8)
             
-            return np.dot(X_norm, Y_norm.T)
+            return X_norm @ Y_norm.T
         except Exception as e:
             logger.error(f"Error in fallback cosine similarity: {e}")
             return np.array([[0.0]])
@@ -93,18 +119,27 @@ class DependencyManager:
             def __init__(self):
                 self.mean_ = None
                 self.scale_ = None
+                self._inverse_scale = None
             
             def fit(self, X):
-                X = np.array(X)
-                self.mean_ = np.mean(X, axis=0)
-                self.scale_ = np.std(X, axis=0) + 1e-8
+                X = np.asarray(X, dtype=np.float32)
+                # A 1-D input is one feature over many samples, as np.mean/np.std(axis=0) treated it
+                if X.ndim == 1:
+                    X = X.reshape(-1, 1)
+                n = X.shape[0]
+                # Mean and variance from one pass of sums (E[X], E[X^2]), accumulated in double precision
+                mean = X.sum(axis=0, dtype=np.float64) / n
+                variance = np.einsum('ij,ij->j', X, X, dtype=np.float64) / n - mean ** 2
+                self.mean_ = mean.astype(np.float32)
+                self.scale_ = (np.sqrt(np.maximum(variance, 0.0)) + 1e-8).astype(np.float32)
+                self._inverse_scale = 1.0 / self.scale_
                 return self
             
             def transform(self, X):
-                X = np.array(X)
+                X = np.asarray(X, dtype=np.float32)
                 if self.mean_ is None:
                     raise ValueError("Must fit scaler first")
-                return (X - self.mean_) / self.scale_
+                return (X - self.mean_) * self._inverse_scale
             
             def fit_transform(self, X):
                 return self.fit(X).transform(X)
@@ -135,12 +170,34 @@ class DependencyManager:
         return missing
 
 
-# Global dependency manager instance
-deps = DependencyManager()
+# Global dependency manager instance, created on first use (module attribute `deps`)
+_deps = None
+_deps_lock = threading.Lock()
+
+# Module attributes resolved on first access by __getattr__
+_LAZY_EXPORTS = ('deps', 'cosine_similarity', 'StandardScaler')
 
-# Export commonly used functions
-cosine_similarity = deps.cosine_similarity
-StandardScaler = deps.StandardScaler
+
+def get_deps():
+    """Global DependencyManager, created on the first call"""
+    global _deps
+    with _deps_lock:
+        if _deps is None:
+            _deps = DependencyManager()
+    return _deps
+
+
+def __getattr__(name):
+    """Export the dependency manager and commonly used functions, resolved on first access so importing this module stays cheap"""
+    if name == 'deps':
+        return get_deps()
+    if name in _LAZY_EXPORTS:
+        return getattr(get_deps(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
 
 
 # =============================================================================
@@ -169,17 +226,13 @@ def safe_cosine_similarity(vector1, vector2):
         v1_clean = v1[valid_indices]
         v2_clean = v2[valid_indices]
         
-        # Calculate similarity
-        similarity_matrix = cosine_similarity([v1_clean], [v2_clean])
-        
-        # Extract scalar value
-        if hasattr(similarity_matrix, 'shape'):
-            if similarity_matrix.shape == (1, 1):
-                return float(similarity_matrix[0, 0])
-            elif similarity_matrix.shape == (1,):
-                return float(similarity_matrix[0])
+        # Calculate similarity directly: dot product over the product of norms (one sqrt, no 1 x 1 matrices)
+        dot = float(np.dot(v1_clean, v2_clean))
+        norm_product = float(np.dot(v1_clean, v1_clean)) * float(np.dot(v2_clean, v2_clean))
+        if norm_product == 0.0:
+            return 0.0
         
-        return float(similarity_matrix)
+        return dot / math.sqrt(norm_product)
         
     except Exception as e:
         logger.debug(f"Error in safe_cosine_similarity: {e}")
@@ -238,17 +291,17 @@ def validate_protein_data(protein_data, required_fields=None):
         return False, issues
     
     # Check required fields
-    for field in required_fields:
-        if field not in protein_data.columns:
-            issues.append(f"Missing required field: {field}")
+    columns = set(protein_data.columns)
+    issues.extend(f"Missing required field: {field}" for field in required_fields if field not in columns)
     
     # Check minimum number of proteins
     if len(protein_data) < 3:
         issues.append(f"Need at least 3 proteins for analysis, found {len(protein_data)}")
     
     # Check for duplicate UniProt IDs
-    if 'UniProt_ID' in protein_data.columns:
-        duplicates = protein_data['UniProt_ID'].duplicated().sum()
+    if 'UniProt_ID' in columns:
+        # One hashing pass, without materializing a duplicated() mask
+        duplicates = len(protein_data) - protein_data['UniProt_ID'].nunique(dropna=False)
         if duplicates > 0:
             issues.append(f"Found {duplicates} duplicate UniProt IDs")
     
@@ -264,27 +317,39 @@ def get_data_completeness(protein_data, fields_to_check):
             completeness[field] = 0.0
             continue
         
-        valid_count = 0
-        total_count = len(protein_data)
-        
-        for value in protein_data[field]:
-            if is_valid_value(value):
-                valid_count += 1
+        if len(protein_data) == 0:
+            completeness[field] = 0.0
+            continue
         
-        completeness[field] = valid_count / total_count if total_count > 0 else 0.0
+        completeness[field] = float(valid_value_mask(protein_data[field]).mean())
     
     return completeness
 
 
+def valid_value_mask(values):
+    """Column-wise is_valid_value: boolean Series, False where missing or a placeholder"""
+    values = pd.Series(values)
+    valid = values.notna()
+    # Numeric columns can only be missing as NaN, so they skip the string pass
+    if not pd.api.types.is_numeric_dtype(values):
+        valid &= ~values.astype(str).str.strip().str.upper().isin(INVALID_VALUES)
+    return valid
+
+
 def is_valid_value(value):
     """Check if a value is valid (not missing or placeholder)"""
-    if value is None or np.isnan(value) if isinstance(value, (int, float)) else False:
+    if value is None:
         return False
     
-    value_str = str(value).strip().upper()
-    invalid_values = ['', 'NO VALUE FOUND', 'NAN', 'NONE', 'N/A', 'UNKNOWN', 'NULL']
+    # Numbers are valid unless NaN, without going through a string
+    if isinstance(value, (int, float)):
+        return value == value
+    
+    # Other missing scalars (pd.NA, NaT, numpy NaN); containers fall through to the string check
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return False
     
-    return value_str not in invalid_values
+    return str(value).strip().upper() not in INVALID_VALUES
 
 
 # =============================================================================
@@ -358,6 +423,7 @@ class RobustSimilarityPresets:
 
 __all__ = [
     'deps',
+    'get_deps',
     'cosine_similarity', 
     'StandardScaler',
     'safe_cosine_similarity',
@@ -366,5 +432,6 @@ __all__ = [
     'validate_protein_data',
     'get_data_completeness',
     'is_valid_value',
+    'valid_value_mask',
     'RobustSimilarityPresets'
 ]
\ No newline at end of file